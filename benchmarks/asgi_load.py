@@ -0,0 +1,318 @@
+"""
+Нагрузка на WSGI с пулом потоков и на ASGI при множестве медленных клиентов.
+
+Медленные клиенты присылают запрос по кусочкам за --slow-seconds, быстрые
+в это время непрерывно запрашивают --path. WSGI-сервер с --threads
+потоками (как gthread-воркер) читает запрос в рабочем потоке, поэтому
+медленные клиенты занимают все потоки. ASGI дочитывает запрос в цикле
+событий, а Django в пуле из стольких же потоков получает только готовые
+запросы. Перед запуском заполните базу командой seed_benchmark_data:
+
+    python yatube/manage.py seed_benchmark_data --posts 10000
+    python benchmarks/asgi_load.py --threads 8 --slow-clients 64 --duration 10
+
+Серверы здесь минимальные, из стандартной библиотеки, чтобы сравнение
+не зависело от сторонних пакетов; в бою ASGI запускают uvicorn или
+daphne: uvicorn yatube.asgi:application.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+MODES = ('wsgi', 'asgi')
+BACKLOG = 1024
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(share * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """WSGI-сервер с фиксированным числом рабочих потоков."""
+
+    request_queue_size = BACKLOG
+
+    def __init__(self, address, threads):
+        super().__init__(address, QuietHandler)
+        self.pool = ThreadPoolExecutor(threads)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_in_thread, request, client_address)
+
+    def process_in_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def serve_wsgi(port, threads):
+    from yatube.wsgi import application
+
+    server = PooledWSGIServer(('127.0.0.1', port), threads)
+    server.set_app(application)
+    server.serve_forever()
+
+
+async def lifespan_startup(app):
+    messages = asyncio.Queue()
+    started = asyncio.Event()
+    await messages.put({'type': 'lifespan.startup'})
+
+    async def send(message):
+        started.set()
+
+    asyncio.ensure_future(app({'type': 'lifespan'}, messages.get, send))
+    await started.wait()
+
+
+async def serve_asgi(port, threads):
+    settings.ASGI_THREADS = threads
+    from yatube.asgi import application
+
+    async def handle(reader, writer):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, version = lines[0].split(' ')
+        headers = [
+            (name.strip().lower().encode('latin-1'),
+             value.strip().encode('latin-1'))
+            for name, value in (
+                line.split(':', 1) for line in lines[1:] if line)
+        ]
+        length = int(dict(headers).get(b'content-length', 0))
+        body = await reader.readexactly(length) if length else b''
+        path, _, query = target.partition('?')
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': version.split('/')[1],
+            'method': method,
+            'scheme': 'http',
+            'path': unquote(path),
+            'raw_path': path.encode('latin-1'),
+            'query_string': query.encode('latin-1'),
+            'root_path': '',
+            'headers': headers,
+            'server': ('127.0.0.1', port),
+            'client': writer.get_extra_info('peername')[:2],
+        }
+        messages = asyncio.Queue()
+        await messages.put({'type': 'http.request', 'body': body})
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                writer.write(f'HTTP/1.1 {message["status"]} -\r\n'.encode())
+                for name, value in message['headers']:
+                    writer.write(name + b': ' + value + b'\r\n')
+                writer.write(b'connection: close\r\n\r\n')
+            else:
+                writer.write(message.get('body', b''))
+            await writer.drain()
+
+        try:
+            await application(scope, messages.get, send)
+        finally:
+            writer.close()
+
+    await lifespan_startup(application)
+    server = await asyncio.start_server(
+        handle, '127.0.0.1', port, backlog=BACKLOG)
+    async with server:
+        await server.serve_forever()
+
+
+def serve(mode, port, threads):
+    if mode == 'wsgi':
+        serve_wsgi(port, threads)
+    else:
+        asyncio.run(serve_asgi(port, threads))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, options):
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, os.path.abspath(__file__), '--serve', mode,
+        '--port', str(port), '--threads', str(options.threads),
+    ])
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    sys.exit(f'{mode}: сервер не запустился')
+
+
+async def fetch(port, path, slow_seconds=0, pieces=20):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    data = (
+        f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+        f'Connection: close\r\n\r\n'
+    ).encode()
+    if slow_seconds:
+        size = max(1, len(data) // pieces)
+        for start in range(0, len(data), size):
+            writer.write(data[start:start + size])
+            await writer.drain()
+            await asyncio.sleep(slow_seconds / pieces)
+    else:
+        writer.write(data)
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def load(port, options):
+    deadline = time.monotonic() + options.duration
+    timings = []
+    counts = {'errors': 0, 'slow': 0}
+
+    async def fast_client():
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await fetch(port, options.path)
+            except (OSError, ValueError, IndexError):
+                status = None
+            if status != 200:
+                counts['errors'] += 1
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+
+    async def slow_client():
+        while time.monotonic() < deadline:
+            try:
+                await fetch(port, options.path, options.slow_seconds)
+                counts['slow'] += 1
+            except (OSError, ValueError, IndexError):
+                counts['errors'] += 1
+
+    await asyncio.gather(
+        *(slow_client() for _ in range(options.slow_clients)),
+        *(fast_client() for _ in range(options.clients)),
+    )
+    return summarize(timings, counts, options.duration)
+
+
+def summarize(timings, counts, duration):
+    if not timings:
+        return {'per_second': 0, **counts}
+    return {
+        'per_second': round(len(timings) / duration, 1),
+        'latency_ms': {
+            'p50': round(statistics.median(timings), 3),
+            'p90': round(percentile(timings, 0.9), 3),
+            'p99': round(percentile(timings, 0.99), 3),
+        },
+        **counts,
+    }
+
+
+def run(mode, options):
+    process, port = start_server(mode, options)
+    try:
+        # Первый запрос прогревает соединение с базой и кеш.
+        asyncio.run(fetch(port, options.path))
+        return asyncio.run(load(port, options))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--clients', type=int, default=8,
+                        help='Быстрые клиенты, по ним считается задержка')
+    parser.add_argument('--slow-clients', type=int, default=64)
+    parser.add_argument('--slow-seconds', type=float, default=2.0,
+                        help='За сколько медленный клиент шлёт запрос')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--modes', nargs='+', default=list(MODES),
+                        choices=MODES)
+    parser.add_argument('--output', help='Файл для JSON с результатами')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.serve:
+        return serve(options.serve, options.port, options.threads)
+    if not os.path.exists(settings.DATABASES['default']['NAME']):
+        sys.exit('База не найдена: сначала запустите seed_benchmark_data')
+
+    results = {}
+    for mode in options.modes:
+        results[mode] = result = run(mode, options)
+        latency = result.get('latency_ms')
+        timing = (
+            f'p50 {latency["p50"]:>8.2f} ms  p90 {latency["p90"]:>8.2f} ms  '
+            f'p99 {latency["p99"]:>8.2f} ms' if latency else 'нет ответов'
+        )
+        print(
+            f'{mode}  {result["per_second"]:>8} запр/с  {timing}  '
+            f'медленных {result["slow"]}  ошибок {result["errors"]}'
+        )
+
+    if options.output:
+        report = {
+            'meta': {
+                'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'threads': options.threads,
+                'clients': options.clients,
+                'slow_clients': options.slow_clients,
+                'slow_seconds': options.slow_seconds,
+                'path': options.path,
+            },
+            'results': results,
+        }
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Сравнение LocMemCache и общего SQLiteCache под несколькими процессами.
+
+Каждый процесс изображает воркер gunicorn: читает фрагменты по
+степенному распределению ключей, при промахе «рендерит» фрагмент
+(--miss-cost-ms) и кладёт его в кеш, изредка сдвигая версию ленты.
+
+    python benchmarks/cache_backends.py --workers 4 --operations 5000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from itertools import accumulate
+from multiprocessing import get_context
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache.backends.locmem import LocMemCache  # noqa: E402
+
+from core.cache import SQLiteCache  # noqa: E402
+
+
+def make_cache(backend, location):
+    params = {'OPTIONS': {'MAX_ENTRIES': 100000}}
+    if backend == 'locmem':
+        return LocMemCache('benchmark', params)
+    return SQLiteCache(location, params)
+
+
+def worker(backend, location, options, seed, results):
+    cache = make_cache(backend, location)
+    rng = random.Random(seed)
+    keys = range(options.keys)
+    weights = list(accumulate(1 / (rank + 1) for rank in keys))
+    payload = 'x' * options.payload
+    hits = misses = 0
+    timings = []
+    started = time.perf_counter()
+    for key in rng.choices(keys, cum_weights=weights, k=options.operations):
+        if rng.random() < options.invalidate:
+            try:
+                cache.incr('version')
+            except ValueError:
+                cache.add('version', 1, None)
+        version = cache.get('version', 0)
+        cache_key = f'fragment:{version}:{key}'
+        call_started = time.perf_counter()
+        value = cache.get(cache_key)
+        timings.append((time.perf_counter() - call_started) * 1000)
+        if value is None:
+            misses += 1
+            time.sleep(options.miss_cost_ms / 1000)
+            cache.set(cache_key, payload, None)
+        else:
+            hits += 1
+    results.put({
+        'hits': hits,
+        'misses': misses,
+        'elapsed': time.perf_counter() - started,
+        'timings': timings,
+    })
+
+
+def run(backend, options):
+    context = get_context('fork')
+    results = context.Queue()
+    with tempfile.TemporaryDirectory() as directory:
+        location = os.path.join(directory, 'cache.sqlite3')
+        processes = [
+            context.Process(
+                target=worker,
+                args=(backend, location, options, seed, results),
+            )
+            for seed in range(options.workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+    timings = sorted(t for report in reports for t in report['timings'])
+    hits = sum(report['hits'] for report in reports)
+    total = hits + sum(report['misses'] for report in reports)
+    return {
+        'workers': options.workers,
+        'operations': total,
+        'throughput': round(total / elapsed, 1),
+        'hit_ratio': round(hits / total, 4),
+        'get_ms': {
+            'p50': round(statistics.median(timings), 4),
+            'p99': round(timings[int(0.99 * (len(timings) - 1))], 4),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--operations', type=int, default=5000)
+    parser.add_argument('--keys', type=int, default=2000)
+    parser.add_argument('--payload', type=int, default=20000,
+                        help='Размер фрагмента в байтах')
+    parser.add_argument('--miss-cost-ms', type=float, default=2,
+                        help='Цена рендеринга фрагмента при промахе')
+    parser.add_argument('--invalidate', type=float, default=0.001,
+                        help='Доля операций, сдвигающих версию ленты')
+    parser.add_argument('--backends', nargs='+', default=['locmem', 'sqlite'],
+                        choices=['locmem', 'sqlite'])
+    parser.add_argument('--output', help='Файл для JSON с результатами')
+    options = parser.parse_args()
+
+    report = {}
+    for backend in options.backends:
+        report[backend] = run(backend, options)
+        result = report[backend]
+        print(
+            f'{backend:<7} {result["throughput"]:>9} оп/с  '
+            f'попаданий {result["hit_ratio"]:.1%}  '
+            f'get p50 {result["get_ms"]["p50"]} ms  '
+            f'p99 {result["get_ms"]["p99"]} ms'
+        )
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Сравнение двух прогонов benchmarks/run.py.
+
+    python benchmarks/compare.py before.json after.json
+"""
+import argparse
+import json
+
+METRICS = (
+    ('latency_ms', 'p50'),
+    ('latency_ms', 'p90'),
+    ('latency_ms', 'p99'),
+    ('queries', 'max'),
+    ('peak_memory_kb', None),
+)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)['results']
+
+
+def value(result, group, key):
+    metric = result.get(group)
+    return metric if key is None else (metric or {}).get(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument(
+        '--threshold', type=float, default=10,
+        help='Рост в процентах, который считается регрессией',
+    )
+    options = parser.parse_args()
+
+    before = load(options.before)
+    after = load(options.after)
+    regressions = 0
+    for name in sorted(before.keys() & after.keys()):
+        print(name)
+        for group, key in METRICS:
+            old = value(before[name], group, key)
+            new = value(after[name], group, key)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0
+            mark = ''
+            if change > options.threshold:
+                mark = '  <- регрессия'
+                regressions += 1
+            label = f'{group}.{key}' if key else group
+            print(
+                f'  {label:<16} {old:>10} -> {new:>10} '
+                f'({change:+.1f}%){mark}'
+            )
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Замер производительности основных страниц yatube.
+
+Перед запуском заполните базу командой seed_benchmark_data:
+
+    python yatube/manage.py seed_benchmark_data --posts 1000000 --users 100000
+    python benchmarks/run.py --requests 200 --output before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from posts.models import Post, Group, Follow  # noqa: E402
+
+User = get_user_model()
+
+SCENARIOS = (
+    'index', 'group_posts', 'profile', 'post_detail', 'follow_index',
+    'add_comment',
+)
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(share * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def pick_targets():
+    """Самые «тяжёлые» объекты: на них видна худшая задержка."""
+    group = Group.objects.order_by('-posts_count').first()
+    author = User.objects.order_by('-profile__posts_count').first()
+    post = Post.objects.annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count').first()
+    follower = Follow.objects.values('user').annotate(
+        authors=Count('id')).order_by('-authors').first()
+    if not (group and author and post and follower):
+        sys.exit('База пуста: сначала запустите seed_benchmark_data')
+    return {
+        'group': group,
+        'author': author,
+        'post': post,
+        'follower': User.objects.get(pk=follower['user']),
+    }
+
+
+def build_requests(targets, page):
+    query = f'?page={page}' if page > 1 else ''
+    post_id = targets['post'].pk
+    return {
+        'index': ('get', reverse('posts:index') + query, None, False),
+        'group_posts': (
+            'get',
+            reverse('posts:group_posts_page',
+                    kwargs={'slug': targets['group'].slug}) + query,
+            None,
+            False,
+        ),
+        'profile': (
+            'get',
+            reverse('posts:profile',
+                    kwargs={'username': targets['author'].username}) + query,
+            None,
+            False,
+        ),
+        'post_detail': (
+            'get',
+            reverse('posts:post_detail', kwargs={'post_id': post_id}),
+            None,
+            False,
+        ),
+        'follow_index': (
+            'get', reverse('posts:follow_index') + query, None, True),
+        'add_comment': (
+            'post',
+            reverse('posts:add_comment', kwargs={'post_id': post_id}),
+            {'text': 'Комментарий из бенчмарка'},
+            True,
+        ),
+    }
+
+
+def measure(name, request, clients, options):
+    method, url, data, authorized = request
+    client = clients[authorized]
+
+    def call():
+        if options.cold:
+            cache.clear()
+        return getattr(client, method)(url, data)
+
+    for _ in range(options.warmup):
+        call()
+
+    timings = []
+    queries = []
+    statuses = set()
+    for _ in range(options.requests):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(context.captured_queries))
+        statuses.add(response.status_code)
+
+    # tracemalloc заметно замедляет код, поэтому память меряется отдельно.
+    tracemalloc.start()
+    peaks = []
+    for _ in range(options.memory_requests):
+        tracemalloc.reset_peak()
+        call()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return {
+        'url': url,
+        'method': method.upper(),
+        'status': sorted(statuses),
+        'requests': options.requests,
+        'latency_ms': {
+            'min': round(min(timings), 3),
+            'mean': round(statistics.mean(timings), 3),
+            'p50': round(percentile(timings, 0.5), 3),
+            'p90': round(percentile(timings, 0.9), 3),
+            'p99': round(percentile(timings, 0.99), 3),
+            'max': round(max(timings), 3),
+        },
+        'queries': {
+            'min': min(queries),
+            'max': max(queries),
+            'mean': round(statistics.mean(queries), 2),
+        },
+        'peak_memory_kb': round(max(peaks) / 1024, 1) if peaks else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--memory-requests', type=int, default=5)
+    parser.add_argument('--page', type=int, default=1,
+                        help='Номер страницы ленты')
+    parser.add_argument('--cold', action='store_true',
+                        help='Очищать кеш перед каждым запросом')
+    parser.add_argument('--only', nargs='+', choices=SCENARIOS,
+                        default=SCENARIOS)
+    parser.add_argument('--output', help='Файл для JSON с результатами')
+    options = parser.parse_args()
+
+    targets = pick_targets()
+    anonymous = Client()
+    authorized = Client()
+    authorized.force_login(targets['follower'])
+    clients = {False: anonymous, True: authorized}
+    requests = build_requests(targets, options.page)
+
+    results = {}
+    for name in options.only:
+        results[name] = measure(name, requests[name], clients, options)
+        latency = results[name]['latency_ms']
+        print(
+            f'{name:<14} p50 {latency["p50"]:>9.2f} ms  '
+            f'p90 {latency["p90"]:>9.2f} ms  p99 {latency["p99"]:>9.2f} ms  '
+            f'запросов к БД {results[name]["queries"]["max"]:>3}  '
+            f'память {results[name]["peak_memory_kb"]} КБ'
+        )
+
+    report = {
+        'meta': {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': settings.DATABASES['default']['ENGINE'],
+            'cold_cache': options.cold,
+            'page': options.page,
+            'dataset': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'groups': Group.objects.count(),
+                'follows': Follow.objects.count(),
+            },
+        },
+        'results': results,
+    }
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Нагрузочный тест SQLite: читатели лент и писатели комментариев параллельно.
+
+Работает на копии базы, заполненной seed_benchmark_data, и сравнивает
+настройки по умолчанию (rollback journal) с SQLITE_PRAGMAS из settings.
+
+    python benchmarks/sqlite_load.py --readers 4 --writers 2 --duration 10
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, connections, OperationalError  # noqa: E402
+
+from posts.models import Post, Comment, User  # noqa: E402
+from posts.utils import get_feed_queryset  # noqa: E402
+
+PROFILES = {
+    # Как было до настройки: журнал отката и стандартное ожидание
+    # блокировки модуля sqlite3 (5 секунд)
+    'default': {'journal_mode': 'DELETE'},
+    'tuned': settings.SQLITE_PRAGMAS,
+}
+
+
+def reader(ids):
+    group_ids, _, _ = ids
+    list(get_feed_queryset()[:settings.POST_COUNT_DISPLAY])
+    if group_ids:
+        list(get_feed_queryset(Post.objects.filter(
+            group_id=random.choice(group_ids)))[:settings.POST_COUNT_DISPLAY])
+
+
+def writer(ids):
+    _, post_ids, user_ids = ids
+    Comment.objects.create(
+        post_id=random.choice(post_ids),
+        author_id=random.choice(user_ids),
+        text='Комментарий из нагрузочного теста',
+    )
+
+
+def work(role, ids, pragmas, duration, results):
+    settings.SQLITE_PRAGMAS = pragmas
+    operation = reader if role == 'reader' else writer
+    deadline = time.monotonic() + duration
+    timings = []
+    errors = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            operation(ids)
+        except OperationalError:
+            errors += 1
+            connection.close()
+            continue
+        timings.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    results.put((role, timings, errors))
+
+
+def run(profile, options):
+    pragmas = PROFILES[profile]
+    settings.SQLITE_PRAGMAS = pragmas
+    connections.close_all()
+    # Режим журнала сохраняется в файле базы, поэтому ставим его заранее.
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA journal_mode = {pragmas["journal_mode"]}')
+    ids = (
+        list(Post.objects.values_list('group', flat=True).exclude(
+            group=None).distinct()),
+        list(Post.objects.values_list('id', flat=True)[:10000]),
+        list(User.objects.values_list('id', flat=True)[:10000]),
+    )
+    connections.close_all()
+
+    context = get_context('fork')
+    results = context.Queue()
+    roles = ['reader'] * options.readers + ['writer'] * options.writers
+    processes = [
+        context.Process(
+            target=work,
+            args=(role, ids, pragmas, options.duration, results),
+        )
+        for role in roles
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {}
+    for role in ('reader', 'writer'):
+        timings = sorted(t for r, ts, _ in reports if r == role for t in ts)
+        errors = sum(e for r, _, e in reports if r == role)
+        summary[role] = {
+            'per_second': round(len(timings) / options.duration, 1),
+            'errors': errors,
+            'p50_ms': (
+                round(statistics.median(timings), 3) if timings else None
+            ),
+            'p99_ms': (
+                round(timings[int(0.99 * (len(timings) - 1))], 3)
+                if timings else None
+            ),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES),
+                        choices=list(PROFILES))
+    parser.add_argument('--output', help='Файл для JSON с результатами')
+    options = parser.parse_args()
+
+    source = settings.DATABASES['default']['NAME']
+    if not os.path.exists(source):
+        sys.exit('База не найдена: сначала запустите seed_benchmark_data')
+    report = {}
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'db.sqlite3')
+        shutil.copyfile(source, database)
+        settings.DATABASES['default']['NAME'] = database
+        connections['default'].settings_dict['NAME'] = database
+        for profile in options.profiles:
+            report[profile] = run(profile, options)
+            for role, result in report[profile].items():
+                print(
+                    f'{profile:<8} {role:<7} {result["per_second"]:>9} оп/с  '
+                    f'ошибок {result["errors"]:>5}  '
+                    f'p50 {result["p50_ms"]} ms  p99 {result["p99_ms"]} ms'
+                )
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+Время рендеринга страницы index из 10 постов с кеширующим загрузчиком
+шаблонов и без него, а также ленты через {% include %} в цикле и через
+{% render_feed %}.
+
+Перед запуском заполните базу командой seed_benchmark_data:
+
+    python yatube/manage.py seed_benchmark_data --posts 10000
+    python benchmarks/templates.py --renders 300 --output templates.json
+
+Фрагментный кеш ленты и кеш карточек постов перед каждым рендерингом
+очищаются, чтобы цикл по постам действительно выполнялся; --keep-cache
+это отключает, и render_feed берёт карточки из кеша.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.template.backends.django import DjangoTemplates  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from core.template_cache import warm  # noqa: E402
+from posts.counters import get_index_count  # noqa: E402
+from posts.utils import get_page_obj, get_feed_queryset  # noqa: E402
+
+TEMPLATE = 'posts/index.html'
+FEED_SOURCES = {
+    'include': (
+        '{% for post in page_obj %}'
+        "{% include 'posts/post_list.html' %}"
+        '{% endfor %}'
+    ),
+    'render_feed': '{% load feeds %}{% render_feed page_obj %}',
+}
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(share * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def make_backend(cached):
+    params = copy.deepcopy(settings.TEMPLATES[0])
+    loaders = settings.TEMPLATE_LOADERS
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    params['OPTIONS']['loaders'] = loaders
+    params.pop('BACKEND')
+    params['NAME'] = 'cached' if cached else 'plain'
+    params['APP_DIRS'] = False
+    return DjangoTemplates(params)
+
+
+def make_context():
+    page_obj = get_page_obj(get_feed_queryset(), 1, count=get_index_count())
+    page_obj.object_list = list(page_obj.object_list)
+    if not page_obj.object_list:
+        sys.exit('База пуста: сначала запустите seed_benchmark_data')
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    return {'title': 'Главная страница', 'page_obj': page_obj}, request
+
+
+def measure(get_template, context, request, options):
+    def render():
+        if not options.keep_cache:
+            cache.clear()
+        return get_template().render(context, request)
+
+    started = time.perf_counter()
+    render()
+    first = (time.perf_counter() - started) * 1000
+    for _ in range(options.warmup):
+        render()
+    timings = []
+    for _ in range(options.renders):
+        started = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'first_ms': round(first, 3),
+        'latency_ms': {
+            'min': round(min(timings), 3),
+            'mean': round(statistics.mean(timings), 3),
+            'p50': round(percentile(timings, 0.5), 3),
+            'p90': round(percentile(timings, 0.9), 3),
+            'p99': round(percentile(timings, 0.99), 3),
+        },
+    }
+
+
+def print_result(name, result):
+    latency = result['latency_ms']
+    print(
+        f'{name:<11} первый {result["first_ms"]:>8.2f} ms  '
+        f'p50 {latency["p50"]:>8.2f} ms  p90 {latency["p90"]:>8.2f} ms  '
+        f'p99 {latency["p99"]:>8.2f} ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--renders', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--keep-cache', action='store_true',
+                        help='Не очищать кеш ленты и карточек')
+    parser.add_argument('--output', help='Файл для JSON с результатами')
+    options = parser.parse_args()
+
+    context, request = make_context()
+    results = {}
+    for name, cached in (('plain', False), ('cached', True)):
+        backend = make_backend(cached)
+        if cached:
+            loaded, _, elapsed = warm(engine=backend.engine)
+            results['warm_templates'] = {
+                'templates': loaded,
+                'elapsed_ms': round(elapsed * 1000, 3),
+            }
+        results[name] = measure(
+            lambda: backend.get_template(TEMPLATE), context, request, options)
+        print_result(name, results[name])
+    speedup = (
+        results['plain']['latency_ms']['p50']
+        / results['cached']['latency_ms']['p50']
+    )
+    print(
+        f'Прогрев {results["warm_templates"]["templates"]} шаблонов: '
+        f'{results["warm_templates"]["elapsed_ms"]:.1f} ms, '
+        f'ускорение p50: {speedup:.2f}x'
+    )
+
+    # Только лента, без страницы вокруг, на кеширующем загрузчике.
+    for name, source in FEED_SOURCES.items():
+        feed_template = backend.from_string(source)
+        results[name] = measure(
+            lambda: feed_template, context, request, options)
+        print_result(name, results[name])
+    speedup = (
+        results['include']['latency_ms']['p50']
+        / results['render_feed']['latency_ms']['p50']
+    )
+    print(f'render_feed быстрее цикла с include: {speedup:.2f}x')
+
+    if options.output:
+        report = {
+            'meta': {
+                'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'template': TEMPLATE,
+                'posts': len(context['page_obj'].object_list),
+                'keep_cache': options.keep_cache,
+            },
+            'results': results,
+        }
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,14 @@
+from django.utils.decorators import method_decorator
 from django.views.generic.base import TemplateView
 
+from posts.page_cache import anonymous_cache
 
+
+@method_decorator(anonymous_cache(shared=True), name='dispatch')
 class AboutAuthorView(TemplateView):
     template_name = 'about/author.html'
 
 
+@method_decorator(anonymous_cache(shared=True), name='dispatch')
 class AboutTechView(TemplateView):
     template_name = 'about/tech.html'
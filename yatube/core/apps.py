@@ -3,3 +3,12 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from . import db, performance
+        if settings.PERFORMANCE_METRICS:
+            performance.install()
+        connection_created.connect(db.configure_sqlite)
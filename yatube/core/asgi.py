@@ -0,0 +1,172 @@
+import asyncio
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+
+# Заголовки, которые WSGI передаёт без префикса HTTP_
+UNPREFIXED_HEADERS = ('CONTENT_LENGTH', 'CONTENT_TYPE')
+
+
+class ASGIHandler:
+    """
+    ASGI-приложение для Django 2.2, у которого нет своего. Тело запроса
+    дочитывается, а ответ отдаётся в цикле событий, поэтому медленный
+    клиент не занимает поток; в пуле из ASGI_THREADS потоков работает
+    только сам Django через обычный WSGIHandler.
+    """
+
+    def __init__(self, executor=None):
+        self.wsgi = WSGIHandler()
+        self.executor = executor or ThreadPoolExecutor(
+            settings.ASGI_THREADS, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f'Неподдерживаемый тип ASGI: {scope["type"]}')
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=1)
+        stopped = threading.Event()
+        job = loop.run_in_executor(
+            self.executor, self.respond,
+            self.environ(scope, body), loop, queue, stopped,
+        )
+        try:
+            message = await queue.get()
+            while message is not None:
+                await send(message)
+                message = await queue.get()
+        except BaseException:
+            # Поток перестаёт слать тело и закрывает ответ сам; очередь
+            # разбирается до конца, чтобы он не ждал в ней места.
+            stopped.set()
+            while await queue.get() is not None:
+                pass
+            raise
+        await job
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Шаблоны уже разобраны при импорте yatube/asgi.py.
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """Тело запроса или None, если клиент ушёл, не дослав его."""
+        body = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                body.seek(0)
+                return body
+
+    def respond(self, environ, loop, queue, stopped):
+        """
+        Обрабатывает запрос в одном потоке пула, от request_started до
+        request_finished: соединения с базой принадлежат потоку, и close()
+        должен закрыть именно их. Сообщения для клиента передаются в цикл
+        событий через queue; поток ждёт, пока клиент примет предыдущее.
+        """
+        def put(message):
+            asyncio.run_coroutine_threadsafe(
+                queue.put(message), loop).result()
+
+        try:
+            response, status, headers = self.handle(environ)
+            try:
+                put({
+                    'type': 'http.response.start',
+                    'status': status,
+                    'headers': headers,
+                })
+                if not response.streaming:
+                    put({
+                        'type': 'http.response.body',
+                        'body': response.content,
+                    })
+                    return
+                # Генератор ответа может ходить в базу, поэтому он здесь.
+                for chunk in response:
+                    if stopped.is_set():
+                        return
+                    put({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+                put({'type': 'http.response.body', 'body': b''})
+            finally:
+                # close() шлёт request_finished: соединения закрываются.
+                response.close()
+        finally:
+            put(None)
+
+    def environ(self, scope, body):
+        root_path = scope.get('root_path', '')
+        path = scope['path']
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': root_path,
+            # WSGI передаёт байты пути строкой в latin-1.
+            'PATH_INFO': path.encode().decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(server[0]),
+            'SERVER_PORT': str(server[1]),
+            'REMOTE_ADDR': client[0],
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            key = name.decode('latin-1').upper().replace('-', '_')
+            if key not in UNPREFIXED_HEADERS:
+                key = f'HTTP_{key}'
+            value = value.decode('latin-1')
+            if key in environ:
+                separator = '; ' if key == 'HTTP_COOKIE' else ','
+                value = environ[key] + separator + value
+            environ[key] = value
+        return environ
+
+    def handle(self, environ):
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        response = self.wsgi(environ, start_response)
+        return response, started['status'], started['headers']
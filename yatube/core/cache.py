@@ -0,0 +1,250 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    'key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+    'CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)',
+)
+
+# Чаще раза в секунду время доступа не пишется: горячие ключи не должны
+# превращать каждое чтение в запись.
+ACCESS_RESOLUTION = 1
+
+
+class SQLiteCache(BaseCache):
+    """
+    Кеш в одном файле SQLite, общий для всех процессов на машине.
+
+    Запись атомарна (транзакция SQLite), вытесняются давно не читанные
+    ключи, а изменение в одном процессе сразу видно остальным, поэтому
+    версии лент из posts.feed_cache сбрасываются во всех воркерах.
+    """
+
+    # UPDATE ... RETURNING появился в SQLite 3.35.
+    supports_returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.location = location
+        self._local = threading.local()
+
+    def _connection(self):
+        # После fork соединение родителя использовать нельзя.
+        if getattr(self._local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.location)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.location, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        return connection
+
+    @staticmethod
+    def _dumps(value):
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _loads(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _expiry(self, timeout):
+        # get_backend_timeout() уже возвращает абсолютное время истечения.
+        return self.get_backend_timeout(timeout)
+
+    def _touch(self, connection, keys, now):
+        connection.execute(
+            f'UPDATE cache SET accessed = ? WHERE accessed < ? '
+            f'AND key IN ({", ".join("?" * len(keys))})',
+            [now, now - ACCESS_RESOLUTION, *keys],
+        )
+
+    def get(self, key, default=None, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return self._get_many([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self.make_key(key, version): key for key in keys}
+        for key in keys:
+            self.validate_key(key)
+        values = self._get_many(list(keys))
+        return {keys[key]: value for key, value in values.items()}
+
+    def _get_many(self, keys):
+        if not keys:
+            return {}
+        now = time.time()
+        connection = self._connection()
+        rows = connection.execute(
+            f'SELECT key, value, accessed FROM cache '
+            f'WHERE key IN ({", ".join("?" * len(keys))}) '
+            f'AND (expires IS NULL OR expires > ?)',
+            [*keys, now],
+        ).fetchall()
+        stale = [key for key, _, accessed in rows
+                 if accessed < now - ACCESS_RESOLUTION]
+        if stale:
+            self._touch(connection, stale, now)
+        return {key: self._loads(value) for key, value, _ in rows}
+
+    def _set(self, connection, key, value, timeout):
+        now = time.time()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires, accessed) '
+            'VALUES (?, ?, ?, ?)',
+            [key, self._dumps(value), self._expiry(timeout), now],
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        connection = self._transaction()
+        try:
+            self._cull(connection)
+            self._set(connection, key, value, timeout)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        connection = self._transaction()
+        try:
+            self._cull(connection)
+            for key, value in data.items():
+                key = self.make_key(key, version)
+                self.validate_key(key)
+                self._set(connection, key, value, timeout)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        connection = self._transaction()
+        try:
+            connection.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                [key, time.time()],
+            )
+            self._cull(connection)
+            added = connection.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires, accessed) '
+                'VALUES (?, ?, ?, ?)',
+                [key, self._dumps(value), self._expiry(timeout), time.time()],
+            ).rowcount == 1
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return self._connection().execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            [self._expiry(timeout), key, time.time()],
+        ).rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        update = (
+            'UPDATE cache SET value = value + ? WHERE key = ? '
+            "AND typeof(value) = 'integer' "
+            'AND (expires IS NULL OR expires > ?)'
+        )
+        params = [delta, key, time.time()]
+        connection = self._transaction()
+        try:
+            if self.supports_returning:
+                row = connection.execute(
+                    f'{update} RETURNING value', params).fetchone()
+            elif connection.execute(update, params).rowcount:
+                # BEGIN IMMEDIATE держит запись: никто не изменит значение
+                # между UPDATE и SELECT.
+                row = connection.execute(
+                    'SELECT value FROM cache WHERE key = ?', [key]
+                ).fetchone()
+            else:
+                row = None
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        if row is None:
+            raise ValueError(f"Key '{key}' not found")
+        return row[0]
+
+    def delete(self, key, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        self._connection().execute('DELETE FROM cache WHERE key = ?', [key])
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version) for key in keys]
+        if keys:
+            self._connection().execute(
+                f'DELETE FROM cache '
+                f'WHERE key IN ({", ".join("?" * len(keys))})',
+                keys,
+            )
+
+    def has_key(self, key, version=None):
+        key = self.make_key(key, version)
+        self.validate_key(key)
+        return self._connection().execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            [key, time.time()],
+        ).fetchone() is not None
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def _cull(self, connection):
+        connection.execute(
+            'DELETE FROM cache WHERE expires <= ?', [time.time()])
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count < self._max_entries:
+            return
+        # Как и у встроенных бэкендов: при переполнении удаляется
+        # 1/CULL_FREQUENCY записей, здесь — самых давно прочитанных.
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache')
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE key IN ('
+            'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+            [max(1, count // self._cull_frequency)],
+        )
+
+    def close(self, **kwargs):
+        # Соединение держится на поток, закрывать его после запроса незачем.
+        pass
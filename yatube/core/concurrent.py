@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from . import performance, routers
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Потоки живут всё время процесса, и у каждого своё соединение.
+            _executor = ThreadPoolExecutor(
+                settings.CONCURRENT_QUERIES,
+                thread_name_prefix='queries',
+            )
+        return _executor
+
+
+def _in_transaction():
+    return any(connection.in_atomic_block for connection in connections.all())
+
+
+def _call(state, metrics, func):
+    # Потоки пула не видят request_started и request_finished, поэтому
+    # сломанные и устаревшие по CONN_MAX_AGE соединения закрываются здесь.
+    close_old_connections()
+    with ExitStack() as stack:
+        stack.callback(close_old_connections)
+        stack.enter_context(routers.use_state(state))
+        if metrics is not None:
+            stack.enter_context(performance.use_metrics(metrics))
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(performance.sql_wrapper))
+        return func()
+
+
+def gather(*funcs):
+    """
+    Выполняет независимые чтения из базы одновременно и возвращает их
+    результаты по порядку. Первая функция работает в текущем потоке,
+    остальные — в пуле из CONCURRENT_QUERIES потоков с теми же правилами
+    выбора реплики; их счётчики добавляются к счётчикам запроса. Внутри
+    транзакции, в том числе в тестах, чужие соединения не видят её
+    данных, поэтому там функции выполняются по очереди.
+    """
+    if (
+        not settings.CONCURRENT_QUERIES
+        or len(funcs) < 2
+        or _in_transaction()
+    ):
+        return [func() for func in funcs]
+    state = routers.get_state()
+    metrics = performance.get_metrics()
+    # У каждого потока свои счётчики: они складываются в метрики запроса
+    # после того, как потоки закончат, и не меняются одновременно.
+    children = [
+        None if metrics is None else performance.RequestMetrics()
+        for _ in funcs[1:]
+    ]
+    executor = _get_executor()
+    futures = [
+        executor.submit(_call, state, child, func)
+        for child, func in zip(children, funcs[1:])
+    ]
+    try:
+        first = funcs[0]()
+    finally:
+        # Запущенные чтения дожидаемся, даже если первое упало.
+        wait(futures)
+        for child in children:
+            if child is not None:
+                metrics.merge(child)
+    return [first] + [future.result() for future in futures]
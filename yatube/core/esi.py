@@ -0,0 +1,26 @@
+import re
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+ESI_MARKER = '<!--esi:{}-->'
+ESI_PATTERN = re.compile(r'<!--esi:([\w/.-]+)-->')
+
+
+def enable(request):
+    request.esi = True
+
+
+def is_enabled(request):
+    return getattr(request, 'esi', False)
+
+
+def stitch(request, content):
+    """Подставляет в закешированный HTML фрагменты текущего пользователя."""
+    def render_fragment(match):
+        template_name = match.group(1)
+        if template_name not in settings.ESI_FRAGMENTS:
+            return ''
+        return render_to_string(template_name, request=request)
+
+    return ESI_PATTERN.sub(render_fragment, content)
@@ -0,0 +1,120 @@
+import json
+import logging
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+from .routers import pin_primary
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+
+
+def task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def enqueue(func, *args, priority=PRIORITY_NORMAL, delay=0,
+            max_attempts=None):
+    """
+    Ставит вызов func(*args) в очередь run_workers. func — функция уровня
+    модуля, args должны пережить json.dumps.
+    """
+    payload = json.dumps(args)
+    if settings.JOBS_EAGER:
+        # Аргументы те же, что получит воркер: списки вместо кортежей.
+        func(*json.loads(payload))
+        return None
+    return Job.objects.create(
+        task=task_name(func),
+        args=payload,
+        priority=priority,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def _ready(now):
+    return Job.objects.filter(failed=False, run_after__lte=now)
+
+
+def claim(limit=1):
+    """
+    Забирает до limit готовых задач одним UPDATE, поэтому одна задача
+    не достанется двум воркерам. Пока не истёк таймаут видимости, другие
+    воркеры её не видят; если воркер упал, задачу возьмёт следующий.
+    """
+    now = timezone.now()
+    # Последняя попытка не уложилась в таймаут видимости.
+    _ready(now).filter(attempts__gte=F('max_attempts')).update(
+        failed=True,
+        locked_by='',
+        error='Истёк таймаут видимости',
+    )
+    token = uuid.uuid4().hex
+    ids = _ready(now).order_by('-priority', 'run_after', 'id').values('id')
+    Job.objects.filter(id__in=ids[:limit], run_after__lte=now).update(
+        locked_by=token,
+        attempts=F('attempts') + 1,
+        run_after=now + timedelta(seconds=settings.JOBS_VISIBILITY_TIMEOUT),
+    )
+    return list(
+        Job.objects.filter(locked_by=token).order_by('-priority', 'id'))
+
+
+def _fail(job, error):
+    # Задачу могли забрать заново, если она не уложилась в таймаут.
+    mine = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    if job.attempts >= job.max_attempts:
+        mine.update(failed=True, locked_by='', error=error)
+        return
+    delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+    mine.update(
+        locked_by='',
+        error=error,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def run_job(job):
+    """Выполняет взятую задачу: удаляет её или планирует повтор."""
+    try:
+        func = import_string(job.task)
+        with pin_primary():
+            func(*json.loads(job.args))
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', job)
+        _fail(job, traceback.format_exc())
+        return False
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).delete()
+    return True
+
+
+def work(batch_size=1, sleep=1.0, once=False):
+    """
+    Цикл одного воркера. С once выходит, когда готовых задач не осталось.
+    Возвращает число выполненных и упавших задач.
+    """
+    done = failed = 0
+    while True:
+        jobs = claim(batch_size)
+        for job in jobs:
+            if run_job(job):
+                done += 1
+            else:
+                failed += 1
+        if jobs:
+            continue
+        if once:
+            return done, failed
+        time.sleep(sleep)
@@ -0,0 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import work
+
+
+def _init_process():
+    django.setup()
+    # Соединения родителя не должны переходить в дочерний процесс.
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди core.Job'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOBS_WORKERS,
+            help='Число процессов-воркеров',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1,
+            help='Сколько задач воркер берёт за раз',
+        )
+        parser.add_argument('--sleep', type=float, default=1.0)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и выйти',
+        )
+
+    def handle(self, *args, **options):
+        params = (options['batch_size'], options['sleep'], options['once'])
+        processes = options['processes']
+        if processes <= 1:
+            results = [work(*params)]
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                processes, initializer=_init_process
+            ) as pool:
+                futures = [
+                    pool.submit(work, *params) for _ in range(processes)
+                ]
+                results = [future.result() for future in futures]
+        done = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибками: {failed}'))
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replication import replicate_all
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза между копиями, то есть отставание реплик',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Скопировать один раз и выйти',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('DATABASE_REPLICAS пуст')
+        while True:
+            replicate_all()
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_cache import is_cached, warm
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны из templates/ заранее и проверяет их '
+        'синтаксис'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apps', action='store_true',
+            help='Также шаблоны приложений, в том числе админки',
+        )
+
+    def handle(self, *args, **options):
+        if not is_cached():
+            self.stderr.write(
+                'Кеширующий загрузчик выключен (TEMPLATE_CACHE = False), '
+                'шаблоны будут разбираться заново на каждом рендеринге')
+        loaded, errors, elapsed = warm(options['apps'])
+        for name, error in errors.items():
+            self.stderr.write(f'{name}: {error}')
+        self.stdout.write(
+            f'Разобрано шаблонов: {loaded} за {elapsed * 1000:.0f} мс')
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}')
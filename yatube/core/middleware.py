@@ -0,0 +1,65 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import performance, routers
+
+
+class PerformanceMiddleware:
+    """
+    Считает время запроса, SQL, рендеринга шаблонов и миниатюр, попадания
+    в кеш и копит гистограмму по view. Заголовок Server-Timing получают
+    только сотрудники и режим DEBUG: остальным незачем видеть устройство
+    сайта.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PERFORMANCE_METRICS:
+            return self.get_response(request)
+        with performance.collect() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(performance.sql_wrapper))
+            response = self.get_response(request)
+            user = getattr(request, 'user', None)
+            if settings.DEBUG or getattr(user, 'is_staff', False):
+                response['Server-Timing'] = metrics.server_timing()
+            match = request.resolver_match
+            if match is not None:
+                performance.record(match.view_name, metrics)
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Запросы, которые пишут в базу, и следующие за ними в течение
+    REPLICA_PIN_SECONDS читают из основной базы, а не с отстающей реплики.
+    """
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        pinned = (
+            request.method not in self.safe_methods
+            or settings.REPLICA_PIN_COOKIE in request.COOKIES
+        )
+        with routers.pin_primary(pinned):
+            response = self.get_response(request)
+            written = routers.has_written()
+        if written:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
@@ -9,3 +9,31 @@ class CreateModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Job(CreateModel):
+    """Отложенный вызов функции для run_workers."""
+
+    task = models.CharField('Задача', max_length=200)
+    # JSON-список позиционных аргументов задачи
+    args = models.TextField('Аргументы', default='[]')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    # Раньше этого времени задачу не берут: отложенный запуск, пауза
+    # перед повтором или таймаут видимости у взятой задачи.
+    run_after = models.DateTimeField('Выполнить после')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Максимум попыток')
+    locked_by = models.CharField('Взята', max_length=32, blank=True)
+    failed = models.BooleanField('Не выполнена', default=False)
+    error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['failed', 'run_after'],
+                name='job_failed_run_after_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk}'
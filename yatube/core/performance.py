@@ -0,0 +1,222 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import (
+    DjangoTemplates, Template, reraise)
+
+_state = threading.local()
+_histogram_lock = threading.Lock()
+_histograms = {}
+
+# Метрики, по которым копится гистограмма, в порядке вывода
+HISTOGRAM_METRICS = ('total', 'sql', 'template', 'thumbnail')
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(HISTOGRAM_METRICS[1:], 0.0)
+        self.queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._depth = {}
+
+    def merge(self, other):
+        for name, duration in other.durations.items():
+            self.durations[name] += duration
+        self.queries += other.queries
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+    @property
+    def total(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        parts = [
+            f'total;dur={self.total:.1f}',
+            f'sql;dur={self.durations["sql"]:.1f};'
+            f'desc="{self.queries} queries"',
+            f'template;dur={self.durations["template"]:.1f}',
+            f'cache;desc="hits={self.cache_hits} misses={self.cache_misses}"',
+        ]
+        if self.durations['thumbnail']:
+            parts.append(f'thumbnail;dur={self.durations["thumbnail"]:.1f}')
+        return ', '.join(parts)
+
+
+def get_metrics():
+    return getattr(_state, 'metrics', None)
+
+
+@contextmanager
+def collect():
+    _state.metrics = RequestMetrics()
+    try:
+        yield _state.metrics
+    finally:
+        _state.metrics = None
+
+
+@contextmanager
+def use_metrics(metrics):
+    """Считает запросы этого потока в metrics, например, в метрики gather."""
+    previous = get_metrics()
+    _state.metrics = metrics
+    try:
+        yield
+    finally:
+        _state.metrics = previous
+
+
+@contextmanager
+def timer(name):
+    """Добавляет время блока к метрике name без учёта вложенных вызовов."""
+    metrics = get_metrics()
+    if metrics is None:
+        yield
+        return
+    depth = metrics._depth.get(name, 0)
+    metrics._depth[name] = depth + 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._depth[name] = depth
+        if not depth:
+            metrics.durations[name] += (time.perf_counter() - started) * 1000
+
+
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    metrics = get_metrics()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    metrics.queries += 1
+    with timer('sql'):
+        return execute(sql, params, many, context)
+
+
+_missing = object()
+
+
+def _count_get(get):
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, _missing, version)
+        metrics = get_metrics()
+        if metrics is not None:
+            if value is _missing:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _missing else value
+    wrapper.counted = True
+    return wrapper
+
+
+def _count_get_many(get_many):
+    @wraps(get_many)
+    def wrapper(self, keys, version=None):
+        values = get_many(self, keys, version)
+        metrics = get_metrics()
+        if metrics is not None:
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+    wrapper.counted = True
+    return wrapper
+
+
+def install():
+    """
+    Подключает счётчики попаданий к настроенным бэкендам кеша: своих
+    обёрток, как execute_wrapper у базы, у них нет.
+    """
+    from django.core.cache import caches
+
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if not getattr(backend.get, 'counted', False):
+            backend.get = _count_get(backend.get)
+        if not getattr(backend.get_many, 'counted', False):
+            backend.get_many = _count_get_many(backend.get_many)
+
+
+class TimedTemplate(Template):
+    @timed('template')
+    def render(self, context=None, request=None):
+        return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд шаблонов Django, который считает время рендеринга."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as error:
+            reraise(error, self)
+
+
+def record(view_name, metrics):
+    values = {'total': metrics.total, **metrics.durations}
+    buckets = settings.PERFORMANCE_BUCKETS
+    with _histogram_lock:
+        histogram = _histograms.setdefault(view_name, {
+            name: {'count': 0, 'sum': 0.0, 'buckets': [0] * (len(buckets) + 1)}
+            for name in HISTOGRAM_METRICS
+        })
+        for name, value in values.items():
+            metric = histogram[name]
+            metric['count'] += 1
+            metric['sum'] += value
+            metric['buckets'][bisect.bisect_left(buckets, value)] += 1
+
+
+def percentile(metric, share):
+    """Верхняя граница корзины, в которую попадает перцентиль."""
+    buckets = settings.PERFORMANCE_BUCKETS
+    if not metric['count']:
+        return None
+    rank = share * metric['count']
+    seen = 0
+    for index, count in enumerate(metric['buckets']):
+        seen += count
+        if seen >= rank:
+            return buckets[index] if index < len(buckets) else None
+    return None
+
+
+def get_histograms():
+    with _histogram_lock:
+        return {
+            view_name: {
+                name: {**metric, 'buckets': list(metric['buckets'])}
+                for name, metric in histogram.items()
+            }
+            for view_name, histogram in _histograms.items()
+        }
+
+
+def reset_histograms():
+    with _histogram_lock:
+        _histograms.clear()
@@ -0,0 +1,23 @@
+import sqlite3
+
+from django.conf import settings
+from django.db import connections
+
+
+def replicate(alias):
+    """
+    Заменитель настоящей репликации для локальной разработки: копирует
+    основную базу SQLite в файл реплики через backup API.
+    """
+    source = connections['default']
+    source.ensure_connection()
+    target = sqlite3.connect(settings.DATABASES[alias]['NAME'], timeout=30)
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+
+
+def replicate_all():
+    for alias in settings.DATABASE_REPLICAS:
+        replicate(alias)
@@ -0,0 +1,87 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    return getattr(_state, 'written', False)
+
+
+@contextmanager
+def pin_primary(pinned=True):
+    """
+    Область запроса: при pinned=True все чтения идут в основную базу,
+    а после первой записи внутри блока — в любом случае.
+    """
+    previous = _state.__dict__.copy()
+    _state.scoped, _state.pinned, _state.written = True, pinned, False
+    try:
+        yield
+    finally:
+        _state.__dict__.clear()
+        _state.__dict__.update(previous)
+
+
+def get_state():
+    """Состояние области запроса для передачи в другой поток."""
+    return _state.__dict__.copy()
+
+
+@contextmanager
+def use_state(state):
+    previous = _state.__dict__.copy()
+    _state.__dict__.clear()
+    _state.__dict__.update(state)
+    try:
+        yield
+    finally:
+        _state.__dict__.clear()
+        _state.__dict__.update(previous)
+
+
+def _primary_only(model):
+    opts = model._meta
+    return (
+        opts.app_label in settings.REPLICA_PRIMARY_ONLY
+        or opts.label_lower in settings.REPLICA_PRIMARY_ONLY
+    )
+
+
+class ReplicaRouter:
+    """
+    Чтения внутри запроса уходят на случайную реплику из DATABASE_REPLICAS,
+    записи — в default. После первой записи чтения до конца запроса тоже
+    идут в default, чтобы автор сразу видел свои изменения. Вне запроса
+    (команды, воркеры) всё читается из default: там чтение обычно
+    предшествует записи, и отставание реплики недопустимо.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            not settings.DATABASE_REPLICAS
+            or not getattr(_state, 'scoped', False)
+            or is_pinned()
+            or _primary_only(model)
+        ):
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if getattr(_state, 'scoped', False) and not _primary_only(model):
+            _state.pinned = _state.written = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными от sync_replicas.
+        return db not in settings.DATABASE_REPLICAS
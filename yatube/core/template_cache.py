@@ -0,0 +1,58 @@
+import os
+import time
+
+from django.template import TemplateSyntaxError, engines
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def _loaders(engine):
+    for loader in engine.template_loaders:
+        # Кеширующий загрузчик сам ничего не читает, файлы ищут вложенные.
+        yield from getattr(loader, 'loaders', [loader])
+
+
+def template_names(engine, include_apps=False):
+    """Имена шаблонов из DIRS и, по желанию, из templates/ приложений."""
+    directories = list(engine.dirs)
+    if include_apps:
+        for loader in _loaders(engine):
+            directories += [
+                directory for directory in loader.get_dirs()
+                if directory not in directories
+            ]
+    names = set()
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if file.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.relpath(os.path.join(root, file), directory)
+                    names.add(path.replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm(include_apps=False, engine=None):
+    """
+    Разбирает шаблоны заранее, чтобы кеширующий загрузчик отдавал готовое
+    дерево уже первому запросу. Возвращает число шаблонов, ошибки по
+    именам и затраченное время.
+    """
+    if engine is None:
+        engine = engines['django'].engine
+    started = time.perf_counter()
+    loaded, errors = 0, {}
+    for name in template_names(engine, include_apps):
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors[name] = error
+        else:
+            loaded += 1
+    return loaded, errors, time.perf_counter() - started
+
+
+def is_cached(engine=None):
+    if engine is None:
+        engine = engines['django'].engine
+    return any(
+        hasattr(loader, 'loaders') for loader in engine.template_loaders)
@@ -0,0 +1,23 @@
+from django import template
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+from core import esi as esi_utils
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def esi(context, template_name):
+    """
+    Фрагмент, зависящий от пользователя. При рендеринге в страничный кеш
+    вместо него остаётся метка, которую core.esi.stitch заменит при отдаче.
+    """
+    if template_name not in settings.ESI_FRAGMENTS:
+        raise template.TemplateSyntaxError(
+            f'{template_name} нет в ESI_FRAGMENTS')
+    request = context.get('request')
+    if request is not None and esi_utils.is_enabled(request):
+        return mark_safe(esi_utils.ESI_MARKER.format(template_name))
+    fragment = context.template.engine.get_template(template_name)
+    return fragment.render(context)
@@ -0,0 +1,228 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_started, request_finished
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from core import performance, routers
+from core.asgi import ASGIHandler
+from core.concurrent import gather
+from posts.models import Post
+
+User = get_user_model()
+
+
+class InlineExecutor(Executor):
+    """Выполняет задачи пула сразу, в потоке теста."""
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+def call(app, scope, messages):
+    sent = []
+    messages = list(messages)
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def http_scope(path, query_string=b'', headers=()):
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query_string,
+        'headers': list(headers),
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000),
+    }
+
+
+class ASGIHandlerTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='автор')
+        Post.objects.create(author=self.user, text='Тестовый пост')
+        # Настоящий пул: код Django работает не в потоке цикла событий.
+        executor = ThreadPoolExecutor(2, thread_name_prefix='asgi')
+        self.addCleanup(executor.shutdown)
+        self.app = ASGIHandler(executor)
+
+    def get(self, path, query_string=b''):
+        sent = call(self.app, http_scope(path, query_string), [
+            {'type': 'http.request', 'body': b''},
+        ])
+        start, *body = sent
+        self.assertEqual(start['type'], 'http.response.start')
+        return start, b''.join(message['body'] for message in body)
+
+    def test_get(self):
+        start, body = self.get('/')
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/html; charset=utf-8'),
+                      start['headers'])
+        self.assertIn('Тестовый пост', body.decode())
+
+    def test_unicode_path_and_query(self):
+        start, body = self.get('/profile/автор/', b'page=1')
+        self.assertEqual(start['status'], 200)
+        self.assertIn('автор', body.decode())
+        start, body = self.get('/search/', 'q=Тестовый'.encode())
+        self.assertEqual(start['status'], 200)
+        self.assertIn('Тестовый пост', body.decode())
+
+    def test_streaming_feed(self):
+        sent = call(self.app, http_scope('/feed/rss/'), [
+            {'type': 'http.request', 'body': b''},
+        ])
+        start, *body = sent
+        self.assertEqual(start['status'], 200)
+        self.assertTrue(all(message['more_body'] for message in body[:-1]))
+        self.assertFalse(body[-1].get('more_body', False))
+        content = b''.join(message['body'] for message in body).decode()
+        self.assertIn('<rss', content)
+        self.assertIn('Тестовый пост', content)
+
+    def test_request_finishes_in_its_thread(self):
+        threads = []
+
+        def record(**kwargs):
+            threads.append(threading.current_thread())
+
+        for signal in (request_started, request_finished):
+            signal.connect(record)
+            self.addCleanup(signal.disconnect, record)
+        for path in ('/', '/feed/rss/'):
+            with self.subTest(path=path):
+                threads.clear()
+                self.get(path)
+                self.assertEqual(len(threads), 2)
+                self.assertIs(threads[0], threads[1])
+                self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_client_gone_while_streaming(self):
+        messages = [{'type': 'http.request', 'body': b''}]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                raise OSError('client gone')
+
+        closed = []
+
+        def record(**kwargs):
+            closed.append(True)
+
+        request_finished.connect(record)
+        self.addCleanup(request_finished.disconnect, record)
+        with self.assertRaises(OSError):
+            asyncio.run(self.app(http_scope('/feed/rss/'), receive, send))
+        self.assertEqual(closed, [True])
+
+    def test_client_disconnected(self):
+        sent = call(self.app, http_scope('/'), [
+            {'type': 'http.request', 'body': b'a', 'more_body': True},
+            {'type': 'http.disconnect'},
+        ])
+        self.assertEqual(sent, [])
+
+
+class ASGIEnvironTest(SimpleTestCase):
+    def test_headers(self):
+        app = ASGIHandler(InlineExecutor())
+        environ = app.environ(http_scope('/', headers=[
+            (b'content-type', b'text/plain'),
+            (b'cookie', b'a=1'),
+            (b'cookie', b'b=2'),
+            (b'accept', b'text/html'),
+            (b'accept', b'*/*'),
+        ]), None)
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(environ['HTTP_COOKIE'], 'a=1; b=2')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,*/*')
+
+    def test_lifespan(self):
+        sent = call(ASGIHandler(InlineExecutor()), {'type': 'lifespan'}, [
+            {'type': 'lifespan.startup'},
+            {'type': 'lifespan.shutdown'},
+        ])
+        self.assertEqual(sent, [
+            {'type': 'lifespan.startup.complete'},
+            {'type': 'lifespan.shutdown.complete'},
+        ])
+
+
+class GatherTest(SimpleTestCase):
+    def test_order_and_state(self):
+        def current():
+            return threading.current_thread().name, routers.is_pinned()
+
+        with routers.pin_primary():
+            results = gather(current, current, current)
+        self.assertEqual([pinned for _, pinned in results], [True] * 3)
+        self.assertEqual(results[0][0], threading.current_thread().name)
+        self.assertTrue(results[1][0].startswith('queries'))
+        self.assertFalse(routers.is_pinned())
+
+    def test_error_is_raised(self):
+        def broken():
+            raise ValueError('test error')
+
+        with self.assertRaises(ValueError):
+            gather(lambda: 1, broken)
+
+    @override_settings(CONCURRENT_QUERIES=0)
+    def test_disabled(self):
+        results = gather(
+            lambda: threading.current_thread().name,
+            lambda: threading.current_thread().name,
+        )
+        self.assertEqual(results, [threading.current_thread().name] * 2)
+
+
+class GatherQueriesTest(TransactionTestCase):
+    def test_queries_are_counted(self):
+        user = User.objects.create_user(username='user')
+        Post.objects.create(author=user, text='Тестовый пост')
+        with performance.collect() as metrics, \
+                connection.execute_wrapper(performance.sql_wrapper):
+            counts, worker_metrics = gather(
+                Post.objects.count,
+                lambda: (User.objects.count(), performance.get_metrics()),
+            )
+        self.assertEqual(counts, 1)
+        self.assertEqual(worker_metrics[0], 1)
+        # Поток считает в свои метрики, они складываются после join.
+        self.assertIsNot(worker_metrics[1], metrics)
+        self.assertEqual(worker_metrics[1].queries, 1)
+        self.assertEqual(metrics.queries, 2)
+
+    def test_old_connections_are_closed(self):
+        closed = []
+
+        def record(**kwargs):
+            closed.append(threading.current_thread().name)
+
+        with mock.patch('core.concurrent.close_old_connections', record):
+            gather(lambda: None, lambda: None)
+        self.assertEqual(len(closed), 2)
+        self.assertTrue(all(name.startswith('queries') for name in closed))
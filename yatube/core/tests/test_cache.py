@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+from multiprocessing import get_context
+
+from django.test import SimpleTestCase
+
+from core.cache import SQLiteCache
+
+
+def bump(location):
+    SQLiteCache(location, {}).incr('version')
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = os.path.join(directory.name, 'cache.sqlite3')
+        self.cache = SQLiteCache(
+            self.location,
+            {'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_FREQUENCY': 5}},
+        )
+
+    def test_basic_operations(self):
+        self.cache.set('post', {'text': 'test'})
+        self.assertEqual(self.cache.get('post'), {'text': 'test'})
+        self.assertFalse(self.cache.add('post', 'other'))
+        self.assertTrue(self.cache.add('new', 1))
+        self.assertEqual(self.cache.incr('new', 2), 3)
+        self.assertEqual(self.cache.get_many(['post', 'new', 'none']),
+                         {'post': {'text': 'test'}, 'new': 3})
+        self.cache.delete('post')
+        self.assertIsNone(self.cache.get('post'))
+        with self.assertRaises(ValueError):
+            self.cache.incr('post')
+
+    def test_incr_without_returning(self):
+        self.cache.supports_returning = False
+        self.cache.set('version', 1)
+        self.assertEqual(self.cache.incr('version', 2), 3)
+        self.assertEqual(self.cache.get('version'), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_expired_entries(self):
+        self.cache.set('key', 'value', 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'value'))
+
+    def test_lru_eviction(self):
+        for i in range(10):
+            self.cache.set(f'key_{i}', i)
+        self.cache._connection().execute(
+            "UPDATE cache SET accessed = 0 WHERE key != ':1:key_0'")
+        self.cache.get('key_0')
+        self.cache.set('key_10', 10)
+        self.assertEqual(self.cache.get('key_0'), 0)
+        self.assertIsNone(self.cache.get('key_1'))
+        self.assertEqual(self.cache.get('key_10'), 10)
+
+    def test_changes_visible_to_other_processes(self):
+        self.cache.set('version', 1)
+        process = get_context('spawn').Process(
+            target=bump, args=(self.location,))
+        process.start()
+        process.join()
+        self.assertEqual(self.cache.get('version'), 2)
@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+from django.db import connections
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+
+
+class SQLitePragmasTest(SimpleTestCase):
+    def test_new_connections_are_tuned(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        handler = ConnectionHandler({
+            'default': {
+                **connections['default'].settings_dict,
+                'NAME': os.path.join(directory.name, 'db.sqlite3'),
+            },
+        })
+        connection = handler['default']
+        self.addCleanup(connection.close)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
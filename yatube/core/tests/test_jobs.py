@@ -0,0 +1,98 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+CALLS = []
+
+
+def record(*args):
+    CALLS.append(args)
+
+
+def broken():
+    raise ValueError('test error')
+
+
+@override_settings(JOBS_EAGER=False, JOBS_MAX_ATTEMPTS=2)
+class JobQueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        job = jobs.enqueue(record, 1, ('a', 'b'))
+        self.assertEqual(job.task, 'core.tests.test_jobs.record')
+        self.assertEqual(CALLS, [])
+        self.assertEqual(jobs.work(once=True), (1, 0))
+        self.assertEqual(CALLS, [(1, ['a', 'b'])])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager(self):
+        self.assertIsNone(jobs.enqueue(record, 1))
+        self.assertEqual(CALLS, [(1,)])
+        self.assertFalse(Job.objects.exists())
+
+    def test_priority_and_delay(self):
+        jobs.enqueue(record, 'low', priority=jobs.PRIORITY_LOW)
+        jobs.enqueue(record, 'later', priority=jobs.PRIORITY_HIGH, delay=60)
+        jobs.enqueue(record, 'high', priority=jobs.PRIORITY_HIGH)
+        jobs.enqueue(record, 'normal')
+        jobs.work(once=True)
+        self.assertEqual(CALLS, [('high',), ('normal',), ('low',)])
+        self.assertEqual(Job.objects.get().args, '["later"]')
+
+    def test_retries_then_fails(self):
+        job = jobs.enqueue(broken)
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertEqual(jobs.work(once=True), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertFalse(job.failed)
+        self.assertIn('test error', job.error)
+        self.assertGreater(job.run_after, timezone.now())
+
+        Job.objects.update(run_after=timezone.now())
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertEqual(jobs.work(once=True), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertTrue(job.failed)
+        self.assertEqual(jobs.work(once=True), (0, 0))
+
+    def test_visibility_timeout(self):
+        jobs.enqueue(record, 1)
+        [claimed] = jobs.claim()
+        self.assertEqual(jobs.claim(), [])
+        # Воркер завис: после таймаута задачу берёт другой.
+        Job.objects.update(run_after=timezone.now() - timedelta(seconds=1))
+        [reclaimed] = jobs.claim()
+        self.assertEqual(reclaimed.pk, claimed.pk)
+        self.assertEqual(reclaimed.attempts, 2)
+        jobs.run_job(claimed)
+        self.assertTrue(Job.objects.exists())
+        jobs.run_job(reclaimed)
+        self.assertFalse(Job.objects.exists())
+
+        # Последняя попытка тоже не уложилась в таймаут.
+        jobs.enqueue(record, 2)
+        jobs.claim()
+        Job.objects.update(
+            attempts=2, run_after=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.claim(), [])
+        self.assertTrue(Job.objects.get().failed)
+
+    def test_run_workers_command(self):
+        jobs.enqueue(record, 1)
+        jobs.enqueue(broken)
+        out = StringIO()
+        with self.assertLogs('core.jobs', 'ERROR'):
+            call_command(
+                'run_workers', '--once', '--processes', '1', stdout=out)
+        self.assertIn('Выполнено задач: 1, с ошибками: 1', out.getvalue())
+        self.assertEqual(CALLS, [(1,)])
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from core import performance
+
+User = get_user_model()
+
+
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        performance.reset_histograms()
+
+    def test_server_timing_header(self):
+        self.assertFalse(
+            self.client.get(reverse('posts:index')).has_header(
+                'Server-Timing'))
+        cache.clear()
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for metric in ('total;dur=', 'sql;dur=', 'template;dur=', 'cache;'):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+        self.assertRegex(timing, r'desc="[1-9]\d* queries"')
+        self.assertRegex(timing, r'misses=[1-9]')
+
+    def test_histogram_collects_views(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        histogram = performance.get_histograms()['posts:index']
+        self.assertEqual(histogram['total']['count'], 2)
+        self.assertEqual(sum(histogram['sql']['buckets']), 2)
+
+    def test_stats_page_is_staff_only(self):
+        url = reverse('performance')
+        user = User.objects.create_user(username='user')
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        client = Client()
+        client.force_login(user)
+        self.assertEqual(client.get(url).status_code, 302)
+        client.force_login(staff)
+        self.client.get(reverse('posts:index'))
+        response = client.get(url, {'format': 'json'})
+        self.assertIn('posts:index', response.json()['views'])
+        self.assertContains(client.get(url), 'posts:index')
@@ -0,0 +1,55 @@
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+
+from core import routers
+from core.middleware import ReplicaStickinessMiddleware
+from core.models import Job
+from posts.models import Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def get_read_db(self, request, write=False):
+        databases = {}
+
+        def view(request):
+            databases['before'] = self.router.db_for_read(Post)
+            if write:
+                self.router.db_for_write(Post)
+            databases['after'] = self.router.db_for_read(Post)
+            return HttpResponse()
+
+        response = ReplicaStickinessMiddleware(view)(request)
+        return databases, response
+
+    def test_reads_go_to_replica(self):
+        databases, response = self.get_read_db(self.factory.get('/'))
+        self.assertEqual(databases, {'before': 'replica', 'after': 'replica'})
+        self.assertNotIn('primary', response.cookies)
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Job), 'default')
+
+    def test_writer_sticks_to_primary(self):
+        databases, response = self.get_read_db(
+            self.factory.get('/profile/author/follow/'), write=True)
+        self.assertEqual(databases, {'before': 'replica', 'after': 'default'})
+        self.assertIn('primary', response.cookies)
+
+        request = self.factory.get('/')
+        request.COOKIES['primary'] = '1'
+        databases, _ = self.get_read_db(request)
+        self.assertEqual(databases['before'], 'default')
+
+    def test_reads_outside_request_go_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        with routers.pin_primary(False):
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+
+    def test_unsafe_methods_read_primary(self):
+        databases, _ = self.get_read_db(self.factory.post('/create/'))
+        self.assertEqual(databases['before'], 'default')
+        self.assertFalse(routers.is_pinned())
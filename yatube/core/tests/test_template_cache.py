@@ -0,0 +1,50 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import Engine, engines
+from django.test import SimpleTestCase
+
+from core.template_cache import is_cached, template_names, warm
+
+
+class TemplateCacheTest(SimpleTestCase):
+    def test_project_templates_are_cached(self):
+        engine = engines['django'].engine
+        self.assertEqual(is_cached(engine), settings.TEMPLATE_CACHE)
+        names = template_names(engine)
+        self.assertIn('posts/index.html', names)
+        self.assertIn('includes/header.html', names)
+        self.assertNotIn('admin/base.html', names)
+        self.assertIn('admin/base.html', template_names(engine, True))
+
+    def test_warm_parses_templates_once(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name, content in (
+            ('good.html', '{{ value }}'),
+            ('nested/page.html', '{% extends "good.html" %}'),
+            ('broken.html', '{% if %}'),
+        ):
+            path = os.path.join(directory.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as file:
+                file.write(content)
+        engine = Engine(dirs=[directory.name], loaders=[(
+            'django.template.loaders.cached.Loader',
+            ['django.template.loaders.filesystem.Loader'],
+        )])
+
+        loaded, errors, _ = warm(engine=engine)
+
+        self.assertEqual(loaded, 2)
+        self.assertEqual(list(errors), ['broken.html'])
+        template = engine.get_template('nested/page.html')
+        self.assertIs(engine.get_template('nested/page.html'), template)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('warm_templates', stdout=stdout, stderr=StringIO())
+        self.assertIn('Разобрано шаблонов', stdout.getvalue())
@@ -1,5 +1,10 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from .performance import HISTOGRAM_METRICS, get_histograms, percentile
+
 
 def page_not_found(request, exception):
     template = 'core/404.html'
@@ -7,8 +12,8 @@ def page_not_found(request, exception):
 
 
 def csrf_failure(request, reason=''):
-    template = 'core/404csrf.html'
-    return render(request, template)
+    template = 'core/403csrf.html'
+    return render(request, template, status=403)
 
 
 def server_error(request):
@@ -19,3 +24,31 @@ def server_error(request):
 def permission_denied(request, exception):
     template = 'core/403.html'
     return render(request, template)
+
+
+@staff_member_required
+def performance_stats(request):
+    template = 'core/performance.html'
+    rows = []
+    for view_name, histogram in sorted(get_histograms().items()):
+        metrics = []
+        for name in HISTOGRAM_METRICS:
+            metric = histogram[name]
+            metrics.append({
+                'name': name,
+                'mean': metric['sum'] / metric['count'],
+                'p50': percentile(metric, 0.5),
+                'p90': percentile(metric, 0.9),
+                'p99': percentile(metric, 0.99),
+            })
+        rows.append({
+            'view_name': view_name,
+            'count': histogram['total']['count'],
+            'metrics': metrics,
+        })
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'buckets': settings.PERFORMANCE_BUCKETS,
+            'views': get_histograms(),
+        })
+    return render(request, template, {'rows': rows})
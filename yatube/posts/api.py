@@ -0,0 +1,140 @@
+import hashlib
+
+from django.contrib.auth.models import User
+from django.shortcuts import get_object_or_404
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import feed_cache
+from .models import Post, Group
+from .serializers import PostSerializer, CommentSerializer
+from .timeline import get_timeline
+from .utils import get_cursor_page, get_comments_page, get_feed_queryset
+
+API_VERSION = 1
+
+
+def get_fields(request):
+    fields = request.GET.get('fields', '')
+    return [name for name in fields.split(',') if name]
+
+
+def make_etag(request, versions):
+    """ETag от поколений ленты и параметров, влияющих на ответ."""
+    key = repr((
+        API_VERSION,
+        request.path,
+        versions,
+        request.GET.get('cursor', ''),
+        get_fields(request),
+    ))
+    return '"' + hashlib.md5(key.encode()).hexdigest() + '"'
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f'{request.path}?{params.urlencode()}'
+
+
+def paginated_response(request, page_obj, serializer_class):
+    serializer = serializer_class(
+        page_obj, many=True, context={'fields': get_fields(request)})
+    return Response({
+        'next': page_url(request, page_obj.next_cursor),
+        'previous': page_url(request, page_obj.previous_cursor),
+        'results': serializer.data,
+    })
+
+
+def feed_response(request, posts_list):
+    page_obj = get_cursor_page(
+        get_feed_queryset(posts_list), request.GET.get('cursor'))
+    return paginated_response(request, page_obj, PostSerializer)
+
+
+def index_etag(request):
+    return make_etag(request, feed_cache.get_feed_versions('index'))
+
+
+def group_etag(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True).first()
+    if group_id is None:
+        return None
+    return make_etag(request, feed_cache.get_feed_versions('group', group_id))
+
+
+def profile_etag(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True).first()
+    if author_id is None:
+        return None
+    return make_etag(
+        request, feed_cache.get_feed_versions('author', author_id))
+
+
+def follow_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return make_etag(
+        request, feed_cache.get_feed_versions('follow', request.user.id))
+
+
+def post_etag(request, post_id):
+    return make_etag(request, feed_cache.get_feed_versions('post', post_id))
+
+
+@gzip_page
+@condition(etag_func=index_etag)
+@api_view(['GET'])
+def index(request):
+    return feed_response(request, Post.objects.all())
+
+
+@gzip_page
+@condition(etag_func=group_etag)
+@api_view(['GET'])
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, group.posts.all())
+
+
+@gzip_page
+@condition(etag_func=profile_etag)
+@api_view(['GET'])
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_response(request, author.posts.all())
+
+
+@gzip_page
+@condition(etag_func=follow_etag)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def follow_index(request):
+    return feed_response(request, get_timeline(request.user))
+
+
+@gzip_page
+@condition(etag_func=post_etag)
+@api_view(['GET'])
+def post_detail(request, post_id):
+    post = get_object_or_404(get_feed_queryset(), pk=post_id)
+    serializer = PostSerializer(
+        post, context={'fields': get_fields(request)})
+    return Response(serializer.data)
+
+
+@gzip_page
+@condition(etag_func=post_etag)
+@api_view(['GET'])
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    page_obj = get_comments_page(post, request.GET.get('cursor'))
+    return paginated_response(request, page_obj, CommentSerializer)
@@ -0,0 +1,71 @@
+import itertools
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Позволяет bulk_create сохранить заданные даты вместо auto_now_add."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Колонки файлов import_posts/export_posts
+POST_COLUMNS = ('id', 'author', 'group', 'pub_date', 'text', 'image')
+FORMATS = ('ndjson', 'csv')
+
+
+def detect_format(path, requested=None):
+    if requested:
+        return requested
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+@contextmanager
+def open_stream(path, mode, stdio):
+    """Открывает файл или, если вместо пути передан «-», stdin/stdout."""
+    if path == '-':
+        yield stdio
+        return
+    with open(path, mode, encoding='utf-8', newline='') as stream:
+        yield stream
+
+
+class Progress:
+    """Считает обработанные строки и пишет скорость в лог команды."""
+
+    def __init__(self, write, every):
+        self.write = write
+        self.every = every
+        self.count = 0
+        self.started = time.monotonic()
+        self._reported = 0
+
+    @property
+    def rate(self):
+        return self.count / max(time.monotonic() - self.started, 1e-9)
+
+    def advance(self, count):
+        self.count += count
+        if self.count - self._reported >= self.every:
+            self._reported = self.count
+            self.write(f'{self.count} строк, {self.rate:.0f} строк/с')
+
+    def summary(self, message):
+        elapsed = time.monotonic() - self.started
+        return (f'{message}: {self.count} за {elapsed:.1f} с '
+                f'({self.rate:.0f} строк/с)')
@@ -0,0 +1,193 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from .feed_cache import get_changed, get_feed_versions, get_version
+from .models import Post, Group
+from .page_cache import anonymous_cache
+from .thumbnails import get_missed_count
+
+# Поднимается при изменении шаблонов, чтобы старые ETag перестали совпадать
+PAGE_VERSION = 1
+
+
+def _meta(request, key, fetch):
+    """Одна лёгкая выборка на запрос и для ETag, и для Last-Modified."""
+    meta = request.__dict__.setdefault('_conditional_meta', {})
+    if key not in meta:
+        meta[key] = fetch()
+    return meta[key]
+
+
+def _etag(request, versions):
+    key = repr((
+        PAGE_VERSION,
+        request.get_full_path(),
+        request.user.pk,
+        # Формы страницы содержат CSRF-токен: после смены секрета
+        # (например, при входе) старая копия из кеша браузера не годится.
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        versions,
+    ))
+    # Weak: страница может отличаться CSRF-токеном при том же содержимом.
+    return 'W/"' + hashlib.md5(key.encode()).hexdigest() + '"'
+
+
+def index_versions(request):
+    return get_feed_versions('index')
+
+
+def index_last_modified(request):
+    return get_changed(('index', None))
+
+
+def _first(queryset):
+    rows = list(queryset[:1])
+    return rows[0] if rows else None
+
+
+def group_meta(request, slug):
+    return _meta(request, 'group', lambda: _first(
+        Group.objects.filter(slug=slug).values_list('id', flat=True)))
+
+
+def group_versions(request, slug):
+    group_id = group_meta(request, slug)
+    if group_id is None:
+        return None
+    return get_feed_versions('group', group_id)
+
+
+def group_last_modified(request, slug):
+    group_id = group_meta(request, slug)
+    if group_id is None:
+        return None
+    return get_changed(('group', group_id))
+
+
+def profile_meta(request, username):
+    return _meta(request, 'profile', lambda: _first(
+        User.objects.filter(username=username).values_list('id', flat=True)))
+
+
+def profile_versions(request, username):
+    author_id = profile_meta(request, username)
+    if author_id is None:
+        return None
+    return get_feed_versions('author', author_id)
+
+
+def profile_last_modified(request, username):
+    author_id = profile_meta(request, username)
+    if author_id is None:
+        return None
+    return get_changed(('author', author_id))
+
+
+def profile_etag(request, username):
+    versions = profile_versions(request, username)
+    if versions is None:
+        return None
+    if request.user.is_authenticated:
+        # Кнопка «Подписаться» зависит от подписок зрителя.
+        versions = versions + [get_version('follow', request.user.pk)]
+    return _etag(request, versions)
+
+
+def post_meta(request, post_id):
+    return _meta(request, 'post', lambda: _first(
+        Post.objects.filter(pk=post_id).values_list('author', 'group')))
+
+
+def _post_scopes(post_id, author_id, group_id):
+    # Сайдбар показывает число постов автора и название группы.
+    scopes = [('post', post_id), ('author', author_id)]
+    if group_id is not None:
+        scopes.append(('group', group_id))
+    return scopes
+
+
+def post_versions(request, post_id):
+    meta = post_meta(request, post_id)
+    if meta is None:
+        return None
+    versions = []
+    for scope, scope_id in _post_scopes(post_id, *meta):
+        versions += get_feed_versions(scope, scope_id)
+    return versions
+
+
+def post_last_modified(request, post_id):
+    meta = post_meta(request, post_id)
+    if meta is None:
+        return None
+    return get_changed(*_post_scopes(post_id, *meta))
+
+
+def versions_etag(versions_func):
+    def etag_func(request, *args, **kwargs):
+        versions = versions_func(request, *args, **kwargs)
+        if versions is None:
+            return None
+        return _etag(request, versions)
+    return etag_func
+
+
+def conditional_page(etag_func, last_modified_func, versions_func,
+                     shared=False):
+    """
+    Отвечает 304 без рендеринга, если страница не менялась, иначе отдаёт
+    её из страничного кеша. Страницы с заглушками миниатюр валидаторов
+    не получают: их надо перезапросить.
+    """
+    def last_modified(request, *args, **kwargs):
+        # Дату, в отличие от ETag, не уточнить CSRF-cookie, а страницы
+        # пользователя могут содержать формы.
+        if request.user.is_authenticated:
+            return None
+        return last_modified_func(request, *args, **kwargs)
+
+    def decorator(view):
+        conditional_view = vary_on_cookie(condition(
+            etag_func=etag_func,
+            last_modified_func=last_modified,
+        )(anonymous_cache(versions_func, shared)(view)))
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            missed = get_missed_count()
+            response = conditional_view(request, *args, **kwargs)
+            if get_missed_count() != missed:
+                del response['ETag']
+                del response['Last-Modified']
+            return response
+        return wrapper
+    return decorator
+
+
+index_page = conditional_page(
+    versions_etag(index_versions),
+    index_last_modified,
+    index_versions,
+    shared=True,
+)
+group_page = conditional_page(
+    versions_etag(group_versions),
+    group_last_modified,
+    group_versions,
+    shared=True,
+)
+profile_page = conditional_page(
+    profile_etag,
+    profile_last_modified,
+    profile_versions,
+)
+post_page = conditional_page(
+    versions_etag(post_versions),
+    post_last_modified,
+    post_versions,
+)
@@ -0,0 +1,89 @@
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+
+from users.models import Profile
+
+from .models import Post, Group, Counter
+
+POSTS_COUNTER = 'posts'
+
+
+def _change(queryset, field, delta):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_index_count(delta):
+    counter = Counter.objects.filter(name=POSTS_COUNTER)
+    if not _change(counter, 'value', delta):
+        Counter.objects.get_or_create(
+            name=POSTS_COUNTER,
+            defaults={'value': Post.objects.count()},
+        )
+
+
+def change_group_count(group_id, delta):
+    if group_id is not None:
+        _change(Group.objects.filter(pk=group_id), 'posts_count', delta)
+
+
+def change_author_count(author_id, delta):
+    profile = Profile.objects.filter(user_id=author_id)
+    # Уменьшение не создаёт строку: при удалении пользователя его профиль
+    # удаляется раньше постов, и новый ссылался бы на удалённую запись.
+    if not _change(profile, 'posts_count', delta) and delta > 0:
+        Profile.objects.get_or_create(
+            user_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(
+                    author_id=author_id).count(),
+            },
+        )
+
+
+def create_author_count(author):
+    Profile.objects.get_or_create(user=author)
+
+
+def get_index_count():
+    # Страницы только читают счётчик: строку создаёт миграция или запись.
+    value = Counter.objects.filter(name=POSTS_COUNTER).values_list(
+        'value', flat=True).first()
+    if value is None:
+        return Post.objects.count()
+    return value
+
+
+def get_author_count(author):
+    try:
+        return author.profile.posts_count
+    except Profile.DoesNotExist:
+        return author.posts.count()
+
+
+def get_follow_count(user):
+    """Число постов в ленте подписок: сумма счётчиков авторов."""
+    return Profile.objects.filter(user__following__user=user).aggregate(
+        total=Coalesce(Sum('posts_count'), 0))['total']
+
+
+def recount():
+    Counter.objects.update_or_create(
+        name=POSTS_COUNTER,
+        defaults={'value': Post.objects.count()},
+    )
+    for group in Group.objects.only('id').iterator():
+        Group.objects.filter(pk=group.pk).update(
+            posts_count=group.posts.count())
+    author_ids = Post.objects.values_list(
+        'author', flat=True).distinct().iterator()
+    for author_id in author_ids:
+        Profile.objects.update_or_create(
+            user_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(
+                    author_id=author_id).count(),
+            },
+        )
+    Profile.objects.exclude(user__posts__isnull=False).update(posts_count=0)
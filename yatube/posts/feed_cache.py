@@ -0,0 +1,74 @@
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+FEED_SCOPES = ('index', 'group', 'author', 'follow', 'post')
+VERSION_KEY = 'feed:version:{}:{}'
+CHANGED_KEY = 'feed:changed:{}:{}'
+
+
+def _key(template, scope, scope_id=None):
+    if scope not in FEED_SCOPES:
+        raise ValueError(f'Неизвестная лента: {scope}')
+    return template.format(scope, '' if scope_id is None else scope_id)
+
+
+def _version_key(scope, scope_id=None):
+    return _key(VERSION_KEY, scope, scope_id)
+
+
+def _new_version():
+    # После вытеснения счётчика из кеша поколение не должно начаться
+    # заново с единицы и совпасть со старыми фрагментами.
+    return int(time.time() * 1000)
+
+
+def get_version(scope, scope_id=None):
+    key = _version_key(scope, scope_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump(scope, scope_id=None):
+    key = _version_key(scope, scope_id)
+    # Время изменения для Last-Modified: в отличие от дат постов оно
+    # учитывает правки и удаления.
+    cache.set(_key(CHANGED_KEY, scope, scope_id), timezone.now(), None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def get_changed(*scopes):
+    """
+    Время последнего изменения лент scopes — пар (лента, id). Пропавшая
+    из кеша отметка, как и поколение, начинается с текущего времени.
+    """
+    keys = [_key(CHANGED_KEY, scope, scope_id) for scope, scope_id in scopes]
+    stamps = cache.get_many(keys)
+    for key in keys:
+        if key not in stamps:
+            stamps[key] = timezone.now()
+            cache.add(key, stamps[key], None)
+    return max(stamps.values())
+
+
+def get_feed_versions(scope, scope_id=None):
+    """Поколения, от которых зависит содержимое ленты."""
+    if scope == 'follow':
+        return [get_version('index'), get_version('follow', scope_id)]
+    return [get_version(scope, scope_id)]
+
+
+def bump_post(post, previous_group_id=None):
+    bump('index')
+    bump('author', post.author_id)
+    bump('post', post.pk)
+    for group_id in {post.group_id, previous_group_id}:
+        if group_id is not None:
+            bump('group', group_id)
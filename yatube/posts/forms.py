@@ -1,5 +1,9 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from core import jobs
+
+from . import images
 from .models import Post, Comment
 
 
@@ -11,6 +15,22 @@ class PostForm(forms.ModelForm):
             'text': 'Текст поста',
         }
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if not isinstance(image, UploadedFile):
+            return image
+        images.validate_upload(image)
+        return images.normalize(image)
+
+    def save(self, commit=True):
+        if 'image' in self.changed_data:
+            # Размеры появятся вместе с копиями картинки.
+            self.instance.image_width = self.instance.image_height = None
+        post = super().save(commit)
+        if commit and post.image and 'image' in self.changed_data:
+            jobs.enqueue(images.render_post_image, post.pk)
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,204 @@
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, ImageOps, ImageSequence
+
+from . import feed_cache
+from .models import Post
+from .validators import validate_image_size
+
+# Размер, который выводят post_list.html и post_detail.html
+RENDITION_SIZE = (960, 339)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+RENDITION_PREFIX = 'renditions'
+
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+# Кадры анимации хранятся целиком, поэтому каждый заменяет предыдущий.
+ANIMATION_OPTIONS = {
+    'GIF': {'disposal': 2},
+    'WEBP': {'quality': 90},
+}
+# Всё остальное из image.info (EXIF, XMP, комментарии) не сохраняется.
+KEPT_INFO = ('transparency', 'icc_profile')
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Пишет загрузку сразу во временный файл и перестаёт сохранять байты
+    сверх IMAGE_MAX_UPLOAD_SIZE: форма отклонит файл по полному размеру,
+    не дожидаясь, пока он весь окажется на диске.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.IMAGE_MAX_UPLOAD_SIZE:
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+
+def limit_image_upload(view):
+    """
+    Ставит ImageUploadHandler только для загрузок в этот view. Обработчики
+    меняются до разбора тела запроса, а его читает проверка CSRF, поэтому
+    она переносится внутрь.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+
+    return wrapper
+
+
+def validate_upload(uploaded):
+    """Проверки до декодирования пикселей: байты, формат и размеры."""
+    validate_image_size(uploaded)
+    uploaded.seek(0)
+    try:
+        with Image.open(uploaded) as image:
+            image_format = image.format
+            width, height = image.size
+    except (OSError, Image.DecompressionBombError):
+        raise ValidationError('Не удалось прочитать картинку')
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError('Поддерживаются JPEG, PNG, GIF и WebP')
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError('Слишком большое разрешение картинки')
+
+
+def _strip(image):
+    image.info = {
+        key: value for key, value in image.info.items() if key in KEPT_INFO
+    }
+    return image
+
+
+def _open(file):
+    file.seek(0)
+    with Image.open(file) as source:
+        image = _strip(ImageOps.exif_transpose(source))
+        return source.format, getattr(source, 'is_animated', False), image
+
+
+def _downscale(image):
+    side = settings.IMAGE_MAX_SIDE
+    image.thumbnail((side, side), Image.LANCZOS)
+    return image
+
+
+def _save_animation(file, image_format, buffer):
+    file.seek(0)
+    with Image.open(file) as source:
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(source):
+            durations.append(frame.info.get('duration', 100))
+            frames.append(_downscale(
+                _strip(ImageOps.exif_transpose(frame).convert('RGBA'))))
+        loop = source.info.get('loop', 0)
+    frames[0].save(
+        buffer, image_format,
+        save_all=True, append_images=frames[1:],
+        duration=durations, loop=loop,
+        **ANIMATION_OPTIONS.get(image_format, {}),
+    )
+    return frames[0]
+
+
+def normalize(uploaded):
+    """
+    Поворачивает картинку по EXIF, уменьшает до IMAGE_MAX_SIDE и
+    пересохраняет в том же формате без метаданных. Возвращает файл для
+    ImageField; готовое изображение лежит в его атрибуте image.
+    """
+    image_format, animated, image = _open(uploaded)
+    buffer = BytesIO()
+    if animated:
+        # Пересохраняются все кадры: метаданные могут быть и в них.
+        image = _save_animation(uploaded, image_format, buffer)
+    else:
+        _downscale(image)
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(
+            buffer, image_format, **SAVE_OPTIONS.get(image_format, {}))
+    result = ContentFile(buffer.getvalue(), name=uploaded.name)
+    result.image = image
+    return result
+
+
+def rendition_name(name, kind):
+    width, height = RENDITION_SIZE
+    return f'{RENDITION_PREFIX}/{name}.{width}x{height}.{kind}'
+
+
+def _flatten(image):
+    if image.mode in ('RGB', 'L'):
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def save_renditions(name, image):
+    """Кадрирует картинку под шаблоны и сохраняет её в WebP и JPEG."""
+    fitted = ImageOps.fit(_flatten(image), RENDITION_SIZE, Image.LANCZOS)
+    for kind, (image_format, options) in RENDITION_FORMATS.items():
+        buffer = BytesIO()
+        fitted.save(buffer, image_format, **options)
+        path = rendition_name(name, kind)
+        # Имя исходника уникально, поэтому старый файл можно заменить.
+        default_storage.delete(path)
+        default_storage.save(path, ContentFile(buffer.getvalue()))
+
+
+def process_post_image(post):
+    """Копии и размеры для уже сохранённой картинки поста."""
+    with default_storage.open(post.image.name) as stored:
+        _, _, image = _open(stored)
+    save_renditions(post.image.name, image)
+    post.image_width, post.image_height = image.size
+
+
+def store_post_image(post):
+    """Копии картинки, её размеры в базе и новые поколения лент."""
+    process_post_image(post)
+    # Картинку могли заменить, пока строились копии этой.
+    Post.objects.filter(pk=post.pk, image=post.image.name).update(
+        image_width=post.image_width,
+        image_height=post.image_height,
+        updated=timezone.now(),
+    )
+    feed_cache.bump_post(post)
+
+
+def render_post_image(post_id):
+    """Фоновая задача для картинки, загруженной через форму."""
+    post = Post.objects.only('id', 'image', 'author', 'group').filter(
+        pk=post_id).first()
+    if post is not None and post.image:
+        store_post_image(post)
+
+
+def rendition_urls(name):
+    return {
+        kind: default_storage.url(rendition_name(name, kind))
+        for kind in RENDITION_FORMATS
+    }
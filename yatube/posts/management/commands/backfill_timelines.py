@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.timeline import rebuild_timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок пользователей из таблицы Follow'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Имя пользователя, можно указать несколько раз',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(follower__isnull=False).distinct()
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+        count = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            rebuild_timeline(user_id)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересобрано лент: {count}')
+        )
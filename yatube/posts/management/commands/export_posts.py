@@ -0,0 +1,62 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand
+
+from posts.bulk import (
+    FORMATS, POST_COLUMNS, Progress, detect_format, open_stream,
+)
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты в NDJSON или CSV, не загружая их в память'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки, «-» — стандартный вывод',
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--author', help='Только посты этого автора')
+        parser.add_argument('--group', help='Только посты этой группы')
+
+    def rows(self, options):
+        posts = Post.objects.order_by('id')
+        if options['author']:
+            posts = posts.filter(author__username=options['author'])
+        if options['group']:
+            posts = posts.filter(group__slug=options['group'])
+        values = posts.values_list(
+            'id', 'author__username', 'group__slug', 'pub_date', 'text',
+            'image',
+        ).iterator(chunk_size=options['chunk_size'])
+        for post_id, author, group, pub_date, text, image in values:
+            yield {
+                'id': post_id,
+                'author': author,
+                'group': group or '',
+                'pub_date': pub_date.isoformat(),
+                'text': text,
+                'image': image or '',
+            }
+
+    def handle(self, *args, **options):
+        path = options['path']
+        output_format = detect_format(path, options['format'])
+        progress = Progress(self.stderr.write, options['chunk_size'] * 10)
+        # Данные идут в stdout как есть, без перевода строки от Django.
+        self.stdout.ending = ''
+        with open_stream(path, 'w', self.stdout) as stream:
+            if output_format == 'csv':
+                writer = csv.DictWriter(stream, POST_COLUMNS)
+                writer.writeheader()
+                write = writer.writerow
+            else:
+                def write(row):
+                    stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+            for row in self.rows(options):
+                write(row)
+                progress.advance(1)
+        self.stderr.write(progress.summary('Выгружено постов'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+
+from posts.models import Post
+from posts.thumbnails import POST_THUMBNAILS
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие миниатюры картинок постов'
+
+    def handle(self, *args, **options):
+        images = Post.objects.exclude(image='').values_list(
+            'image', flat=True).iterator()
+        count = 0
+        for name in images:
+            for geometry, thumbnail_options in POST_THUMBNAILS:
+                default.backend.generate(
+                    name, geometry, **thumbnail_options)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано картинок: {count}')
+        )
@@ -0,0 +1,228 @@
+import csv
+import json
+import os
+import sys
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.routers import pin_primary
+from posts import counters, feed_cache
+from posts.bulk import (
+    FORMATS, Progress, chunked, detect_format, explicit_dates, open_stream,
+)
+from posts.models import Post, Group
+from posts.search import get_backend
+from posts.thumbnails import schedule_post_thumbnails
+from posts.timeline import fan_out_posts
+
+User = get_user_model()
+
+# Столько раз пачка перезапускается, если её id успел занять новый пост.
+INSERT_ATTEMPTS = 3
+
+
+def next_post_id():
+    last = Post.objects.aggregate(last=Max('id'))['last'] or 0
+    if connection.vendor == 'sqlite':
+        # AUTOINCREMENT не выдаёт id удалённых постов повторно,
+        # импорт тоже не должен: на них могли остаться ключи кеша.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT seq FROM sqlite_sequence WHERE name = %s',
+                [Post._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row:
+            last = max(last, row[0])
+    return last + 1
+
+
+def reset_post_sequence():
+    """Сдвигает счётчик id за выданные вручную, где база не делает это сама."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [Post])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из NDJSON или CSV пачками через bulk_create. '
+        'Рассчитана на SQLite: там id постов выдаются заранее, в других '
+        'базах их выдаёт сама база или счётчик сдвигается после загрузки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл с постами, «-» — стандартный ввод')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать неизвестных авторов и группы',
+        )
+        parser.add_argument(
+            '--media-from',
+            help='Каталог, откуда копировать картинки в MEDIA_ROOT; '
+                 'без него пути картинок сохраняются как есть',
+        )
+        parser.add_argument(
+            '--skip-search', action='store_true',
+            help='Не добавлять посты в поисковый индекс',
+        )
+
+    def read(self, stream, input_format):
+        if input_format == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+    def resolve(self, cache, names, lookup, create):
+        """Переводит имена в id, обращаясь к базе только за новыми."""
+        missing = {name for name in names if name and name not in cache}
+        if not missing:
+            return
+        cache.update(lookup(missing))
+        for name in missing - cache.keys():
+            cache[name] = create(name) if self.create_missing else None
+
+    def lookup_authors(self, names):
+        return User.objects.filter(username__in=names).values_list(
+            'username', 'id')
+
+    def create_author(self, username):
+        return User.objects.create_user(username).pk
+
+    def lookup_groups(self, slugs):
+        return Group.objects.filter(slug__in=slugs).values_list('slug', 'id')
+
+    def create_group(self, slug):
+        return Group.objects.create(title=slug, slug=slug).pk
+
+    def copy_image(self, name):
+        if not name or self.media_from is None:
+            return name or ''
+        source = os.path.join(self.media_from, name)
+        if not os.path.isfile(source):
+            self.stderr.write(f'Нет картинки {source}, пост без неё')
+            return ''
+        if default_storage.exists(name):
+            return name
+        with open(source, 'rb') as image:
+            return default_storage.save(name, File(image))
+
+    def build(self, rows):
+        self.resolve(
+            self.authors, {row.get('author') for row in rows},
+            self.lookup_authors, self.create_author,
+        )
+        self.resolve(
+            self.groups, {row.get('group') for row in rows},
+            self.lookup_groups, self.create_group,
+        )
+        posts = []
+        for row in rows:
+            author_id = self.authors.get(row.get('author'))
+            group = row.get('group')
+            group_id = self.groups.get(group) if group else None
+            if author_id is None or (group and group_id is None):
+                self.skipped += 1
+                continue
+            pub_date = parse_datetime(row.get('pub_date') or '')
+            if pub_date is None:
+                pub_date = timezone.now()
+            elif timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+            posts.append(Post(
+                text=row.get('text') or '',
+                author_id=author_id,
+                group_id=group_id,
+                pub_date=pub_date,
+                image=self.copy_image(row.get('image')),
+            ))
+        return posts
+
+    def insert(self, posts):
+        for attempt in range(1, INSERT_ATTEMPTS + 1):
+            try:
+                with transaction.atomic():
+                    if not self.returns_ids:
+                        # bulk_create в SQLite не возвращает id, а они
+                        # нужны лентам и поиску, поэтому id выдаются заранее.
+                        first_id = next_post_id()
+                        for offset, post in enumerate(posts):
+                            post.id = first_id + offset
+                    Post.objects.bulk_create(posts)
+                    self.after_insert(posts)
+                return
+            except IntegrityError:
+                if attempt == INSERT_ATTEMPTS:
+                    raise
+
+    def after_insert(self, posts):
+        # bulk_create не шлёт сигналы: делаем их работу разом на пачку.
+        groups, authors = defaultdict(int), defaultdict(int)
+        for post in posts:
+            groups[post.group_id] += 1
+            authors[post.author_id] += 1
+        counters.change_index_count(len(posts))
+        for group_id, count in groups.items():
+            counters.change_group_count(group_id, count)
+        for author_id, count in authors.items():
+            counters.change_author_count(author_id, count)
+        fan_out_posts(posts)
+        if not self.skip_search:
+            backend = get_backend()
+            for post in posts:
+                backend.index_post(post)
+        for post in posts:
+            schedule_post_thumbnails(post)
+        self.touched_groups.update(groups.keys() - {None})
+        self.touched_authors.update(authors)
+
+    def handle(self, *args, **options):
+        self.create_missing = options['create_missing']
+        self.media_from = options['media_from']
+        self.skip_search = options['skip_search']
+        self.authors, self.groups = {}, {}
+        self.touched_authors, self.touched_groups = set(), set()
+        self.skipped = 0
+        self.returns_ids = connection.features.can_return_ids_from_bulk_insert
+        path = options['path']
+        progress = Progress(self.stderr.write, options['chunk_size'] * 10)
+        with pin_primary(), open_stream(path, 'r', sys.stdin) as stream:
+            rows = self.read(stream, detect_format(path, options['format']))
+            with explicit_dates(Post._meta.get_field('pub_date')):
+                for chunk in chunked(rows, options['chunk_size']):
+                    posts = self.build(chunk)
+                    if posts:
+                        self.insert(posts)
+                    progress.advance(len(posts))
+            if not self.returns_ids:
+                reset_post_sequence()
+        feed_cache.bump('index')
+        for author_id in self.touched_authors:
+            feed_cache.bump('author', author_id)
+        for group_id in self.touched_groups:
+            feed_cache.bump('group', group_id)
+        if self.skipped:
+            self.stderr.write(
+                f'Пропущено строк с неизвестным автором или группой: '
+                f'{self.skipped}')
+        self.stdout.write(
+            self.style.SUCCESS(progress.summary('Загружено постов')))
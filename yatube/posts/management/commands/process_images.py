@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import store_post_image
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт WebP/JPEG-копии и записывает размеры картинок постов, '
+        'загруженных в обход формы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересобрать копии у всех постов с картинкой',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['force']:
+            posts = posts.filter(image_width__isnull=True)
+        count = failed = 0
+        for post in posts.only('id', 'image', 'author', 'group').iterator():
+            try:
+                store_post_image(post)
+            except OSError as error:
+                self.stderr.write(f'{post.image.name}: {error}')
+                failed += 1
+                continue
+            count += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {count}, с ошибками: {failed}'))
@@ -0,0 +1,230 @@
+import itertools
+import os
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+from posts import counters
+from posts.bulk import chunked, explicit_dates
+from posts.images import save_renditions
+from posts.models import Post, Group, Comment, Follow, TimelineEntry
+from posts.search import get_backend
+
+User = get_user_model()
+
+WORDS = (
+    'пост лента автор группа подписка комментарий картинка новость '
+    'сегодня вчера город погода книга фильм музыка код python django '
+    'кошка собака путешествие работа проект идея вопрос ответ'
+).split()
+IMAGE_SIZE = (1280, 720)
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными для бенчмарков'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя',
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Показатель степенного распределения популярности авторов',
+        )
+        parser.add_argument(
+            '--images', type=float, default=0.1,
+            help='Доля постов с картинкой',
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--skip-search', action='store_true',
+            help='Не перестраивать поисковый индекс',
+        )
+
+    def log(self, message, started):
+        self.stdout.write(f'{message} ({time.monotonic() - started:.1f} с)')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.days = options['days']
+        started = time.monotonic()
+
+        user_ids = self.create_users(options['users'])
+        self.log(f'Пользователей: {len(user_ids)}', started)
+        group_ids = self.create_groups(options['groups'])
+        self.log(f'Групп: {len(group_ids)}', started)
+
+        weights = list(itertools.accumulate(
+            1 / (rank ** options['alpha'])
+            for rank in range(1, len(user_ids) + 1)
+        ))
+        self.popular = lambda k: self.random.choices(
+            user_ids, cum_weights=weights, k=k)
+
+        self.create_follows(user_ids, options['follows'])
+        self.log('Подписки созданы', started)
+        images = self.create_images() if options['images'] else []
+        self.create_posts(
+            options['posts'], group_ids, images, options['images'])
+        self.log(f'Постов: {options["posts"]}', started)
+        self.create_comments(options['comments'], user_ids)
+        self.log(f'Комментариев: {options["comments"]}', started)
+
+        with transaction.atomic():
+            counters.recount()
+        self.log('Счётчики пересчитаны', started)
+        self.fill_timelines()
+        self.log('Ленты подписок заполнены', started)
+        if not options['skip_search']:
+            with transaction.atomic():
+                get_backend().rebuild()
+            self.log('Поисковый индекс перестроен', started)
+        # bulk_create не шлёт сигналы, поэтому версии лент не сдвинулись.
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Готово'))
+
+    def random_date(self):
+        return self.now - timedelta(
+            seconds=self.random.randrange(self.days * 24 * 60 * 60))
+
+    def random_text(self, low, high):
+        return ' '.join(
+            self.random.choices(WORDS, k=self.random.randint(low, high)))
+
+    def create_users(self, count):
+        first_id = (User.objects.order_by('-id').values_list(
+            'id', flat=True).first() or 0) + 1
+        password = make_password(None)
+        users = (
+            User(
+                username=f'bench_{first_id + i}',
+                first_name=f'Имя{i}',
+                last_name=f'Фамилия{i}',
+                password=password,
+            )
+            for i in range(count)
+        )
+        for chunk in chunked(users, self.batch_size):
+            User.objects.bulk_create(chunk)
+        return list(User.objects.filter(
+            username__startswith='bench_').values_list('id', flat=True))
+
+    def create_groups(self, count):
+        first_id = (Group.objects.order_by('-id').values_list(
+            'id', flat=True).first() or 0) + 1
+        Group.objects.bulk_create(
+            Group(
+                title=f'Группа {first_id + i}',
+                slug=f'bench-{first_id + i}',
+                description=self.random_text(5, 20),
+            )
+            for i in range(count)
+        )
+        return list(Group.objects.filter(
+            slug__startswith='bench-').values_list('id', flat=True))
+
+    def create_follows(self, user_ids, average):
+        def follows():
+            for user_id in user_ids:
+                count = min(
+                    int(self.random.paretovariate(1.5) * average / 3),
+                    len(user_ids) - 1,
+                )
+                for author_id in set(self.popular(count)) - {user_id}:
+                    yield Follow(
+                        user_id=user_id, author_id=author_id, backfilled=True)
+
+        for chunk in chunked(follows(), self.batch_size):
+            Follow.objects.bulk_create(chunk, ignore_conflicts=True)
+
+    def create_images(self):
+        directory = os.path.join(settings.MEDIA_ROOT, 'posts')
+        os.makedirs(directory, exist_ok=True)
+        names = []
+        for i in range(10):
+            name = f'posts/bench_{i}.jpg'
+            color = tuple(self.random.randrange(256) for _ in range(3))
+            image = Image.new('RGB', IMAGE_SIZE, color)
+            image.save(os.path.join(settings.MEDIA_ROOT, name), 'JPEG')
+            save_renditions(name, image)
+            names.append(name)
+        return names
+
+    def create_posts(self, count, group_ids, images, image_share):
+        def posts():
+            for author_id in self.popular(count):
+                image, width, height = '', None, None
+                if images and self.random.random() < image_share:
+                    image = self.random.choice(images)
+                    width, height = IMAGE_SIZE
+                yield Post(
+                    text=self.random_text(10, 80),
+                    author_id=author_id,
+                    group_id=(
+                        self.random.choice(group_ids)
+                        if group_ids and self.random.random() < 0.7
+                        else None
+                    ),
+                    image=image,
+                    image_width=width,
+                    image_height=height,
+                    pub_date=self.random_date(),
+                )
+
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            for chunk in chunked(posts(), self.batch_size):
+                with transaction.atomic():
+                    Post.objects.bulk_create(chunk)
+
+    def create_comments(self, count, user_ids):
+        if not count:
+            return
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        comments = (
+            Comment(
+                post_id=self.random.choice(post_ids),
+                author_id=author_id,
+                text=self.random_text(3, 30),
+                created=self.random_date(),
+            )
+            for author_id in self.popular(count)
+        )
+        with explicit_dates(Comment._meta.get_field('created')):
+            for chunk in chunked(comments, self.batch_size):
+                with transaction.atomic():
+                    Comment.objects.bulk_create(chunk)
+
+    def fill_timelines(self):
+        # INSERT ... SELECT на порядок быстрее, чем bulk_create по строкам.
+        entry = TimelineEntry._meta.db_table
+        follow = Follow._meta.db_table
+        post = Post._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {entry}')
+            cursor.execute(
+                f'INSERT INTO {entry} (user_id, post_id, pub_date) '
+                f'SELECT f.user_id, p.id, p.pub_date FROM {follow} f '
+                f'JOIN {post} p ON p.author_id = f.author_id '
+                f'WHERE f.author_id IN ('
+                f'SELECT author_id FROM {follow} GROUP BY author_id '
+                f'HAVING COUNT(*) <= %s)',
+                [settings.TIMELINE_FANOUT_LIMIT],
+            )
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 03:25
+
+from django.db import migrations, models
+
+
+def mark_backfilled(apps, schema_editor):
+    # Существующие подписки уже разложены по лентам.
+    Follow = apps.get_model('posts', 'Follow')
+    Follow.objects.update(backfilled=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0026_auto_20261018_0320'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='follow',
+            name='backfilled',
+            field=models.BooleanField(default=False, verbose_name='Посты в ленте'),
+        ),
+        migrations.RunPython(mark_backfilled, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:10
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+POSTS_COUNTER = 'posts'
+
+
+def create_counters(apps, schema_editor):
+    Counter = apps.get_model('posts', 'Counter')
+    Post = apps.get_model('posts', 'Post')
+    Profile = apps.get_model('users', 'Profile')
+    User = apps.get_model('auth', 'User')
+    Counter.objects.get_or_create(
+        name=POSTS_COUNTER,
+        defaults={'value': Post.objects.count()},
+    )
+    Profile.objects.bulk_create(
+        Profile(user_id=user_id) for user_id in User.objects.filter(
+            profile__isnull=True).values_list('id', flat=True)
+    )
+    counts = Post.objects.filter(author=OuterRef('user')).values(
+        'author').annotate(total=Count('id')).values('total')
+    Profile.objects.update(posts_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_profile'),
+        ('posts', '0027_auto_20261018_0325'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_counters, migrations.RunPython.noop),
+    ]
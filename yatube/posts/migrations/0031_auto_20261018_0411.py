@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:11
+
+from django.db import migrations, models
+import posts.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0030_auto_20261018_0356'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, upload_to='posts/', validators=[posts.validators.validate_image_size], verbose_name='Картинка'),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
-from rest_framework import serializers
+from .validators import validate_image_size
 
 User = get_user_model()
 
@@ -34,10 +34,42 @@ class Post(models.Model):
         'Картинка',
         upload_to='posts/',
         blank=True,
+        validators=[validate_image_size],
     )
+    # Заполняются при загрузке, чтобы не открывать картинку при показе;
+    # пустые значения — у картинки ещё нет копий для шаблонов.
+    image_width = models.PositiveIntegerField(
+        'Ширина картинки',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота картинки',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    # Меняется при каждом изменении карточки поста, в том числе при
+    # переименовании группы и смене имени автора: по нему кешируется HTML.
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['pub_date'],
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', 'pub_date'],
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -52,6 +84,11 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Описание группы'
     )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False,
+    )
 
     def __str__(self):
         return self.title
@@ -78,6 +115,14 @@ class Comment(models.Model):
         auto_now_add=True,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx',
+            ),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -90,6 +135,9 @@ class Follow(models.Model):
         related_name='following',
         on_delete=models.CASCADE,
     )
+    # Пока посты автора не разложены в ленту фоновой задачей, лента
+    # читает их напрямую, как у авторов с большим числом подписчиков.
+    backfilled = models.BooleanField('Посты в ленте', default=False)
 
     class Meta:
         constraints = [
@@ -100,7 +148,37 @@ class Follow(models.Model):
         ]
 
 
-class PostSerializer(serializers.ModelSerializer):
+class Counter(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        related_name='timeline_entries',
+        on_delete=models.CASCADE,
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name='timeline_entries',
+        on_delete=models.CASCADE,
+    )
+    pub_date = models.DateTimeField()
+
     class Meta:
-        model = Post
-        fields = ('text', 'pub_date', 'author')
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_timeline_entry',
+                fields=['user', 'post']
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'pub_date', 'post'],
+                name='timeline_user_pub_date_idx',
+            ),
+        ]
@@ -0,0 +1,65 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from core import esi
+
+from .thumbnails import get_missed_count
+
+PAGE_KEY = 'page:{}'
+
+
+def _page_key(request, versions):
+    key = repr((request.get_full_path(), versions))
+    return PAGE_KEY.format(hashlib.md5(key.encode()).hexdigest())
+
+
+def anonymous_cache(versions_func=None, shared=False):
+    """
+    Кеширует страницу целиком, пока не сменятся поколения versions_func.
+    Наполняют кеш анонимы; при shared=True страница отличается для
+    пользователей только ESI-фрагментами, и её из кеша получают все.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            authenticated = request.user.is_authenticated
+            if (
+                not settings.PAGE_CACHE_ENABLED
+                or request.method not in ('GET', 'HEAD')
+                or (authenticated and not shared)
+            ):
+                return view(request, *args, **kwargs)
+            versions = []
+            if versions_func is not None:
+                versions = versions_func(request, *args, **kwargs)
+            key = _page_key(request, versions)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(
+                    esi.stitch(request, content), content_type=content_type)
+            else:
+                esi.enable(request)
+                missed = get_missed_count()
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+                request.esi = False
+                content = response.content.decode(response.charset)
+                complete = get_missed_count() == missed
+                if response.status_code == 200 and complete:
+                    cache.set(
+                        key,
+                        (content, response['Content-Type']),
+                        settings.PAGE_CACHE_TIMEOUT,
+                    )
+                response.content = esi.stitch(request, content)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
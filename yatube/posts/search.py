@@ -0,0 +1,261 @@
+import math
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+
+from .models import Post, Comment
+from .stemmer import terms, stem_text
+from .utils import CursorPage, get_feed_queryset
+
+SEARCH_TABLE = 'posts_search'
+SEARCH_CURSOR_SALT = 'posts.search.cursor'
+
+
+def fts5_available(db_connection):
+    if db_connection.vendor != 'sqlite':
+        return False
+    with db_connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        options = {row[0] for row in cursor.fetchall()}
+    return 'ENABLE_FTS5' in options
+
+
+def create_fts_table(db_connection):
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            f"USING fts5(post_id UNINDEXED, body, tokenize='unicode61')"
+        )
+
+
+def _comment_row(comment_id):
+    # Комментарии лежат в той же таблице с отрицательным rowid.
+    return -comment_id
+
+
+class Fts5Backend:
+    def _replace(self, rowid, post_id, text):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [rowid])
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, post_id, body) '
+                f'VALUES (%s, %s, %s)',
+                [rowid, post_id, stem_text(text)],
+            )
+
+    def _delete(self, rowid):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [rowid])
+
+    def index_post(self, post):
+        self._replace(post.pk, post.pk, post.text)
+
+    def remove_post(self, post_id):
+        self._delete(post_id)
+
+    def index_comment(self, comment):
+        self._replace(_comment_row(comment.pk), comment.post_id, comment.text)
+
+    def remove_comment(self, comment_id):
+        self._delete(_comment_row(comment_id))
+
+    def search(self, query_terms, after, limit):
+        match = ' '.join(f'"{term}"' for term in query_terms)
+        having = ''
+        params = [match]
+        if after is not None:
+            having = 'HAVING score > %s OR (score = %s AND post_id > %s)'
+            params += [after[0], after[0], after[1]]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id, MIN(rank) AS score FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s GROUP BY post_id {having} '
+                f'ORDER BY score, post_id LIMIT %s',
+                params + [limit],
+            )
+            return [(score, post_id) for post_id, score in cursor.fetchall()]
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for post in Post.objects.only('id', 'text').iterator():
+            self.index_post(post)
+        comments = Comment.objects.only('id', 'post_id', 'text').iterator()
+        for comment in comments:
+            self.index_comment(comment)
+
+
+class InvertedIndex:
+    """Инвертированный индекс в памяти процесса для баз без FTS5."""
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.built = False
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.total_length = 0
+
+    def _add(self, rowid, post_id, text):
+        self._remove(rowid)
+        counts = Counter(terms(text))
+        length = sum(counts.values())
+        self.documents[rowid] = (post_id, length, tuple(counts))
+        self.total_length += length
+        for term, frequency in counts.items():
+            self.postings[term][rowid] = frequency
+
+    def _remove(self, rowid):
+        document = self.documents.pop(rowid, None)
+        if document is None:
+            return
+        _, length, document_terms = document
+        self.total_length -= length
+        for term in document_terms:
+            self.postings[term].pop(rowid, None)
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def _ensure_built(self):
+        if self.built:
+            return
+        with self.lock:
+            if self.built:
+                return
+            for post in Post.objects.only('id', 'text').iterator():
+                self._add(post.pk, post.pk, post.text)
+            comments = Comment.objects.only(
+                'id', 'post_id', 'text').iterator()
+            for comment in comments:
+                self._add(
+                    _comment_row(comment.pk), comment.post_id, comment.text)
+            self.built = True
+
+    def _update(self, method, *args):
+        if not self.built:
+            return
+        with self.lock:
+            method(*args)
+
+    def index_post(self, post):
+        self._update(self._add, post.pk, post.pk, post.text)
+
+    def remove_post(self, post_id):
+        self._update(self._remove, post_id)
+
+    def index_comment(self, comment):
+        self._update(
+            self._add,
+            _comment_row(comment.pk),
+            comment.post_id,
+            comment.text,
+        )
+
+    def remove_comment(self, comment_id):
+        self._update(self._remove, _comment_row(comment_id))
+
+    def _score(self, rowid, query_terms, average_length):
+        _, length, _ = self.documents[rowid]
+        count = len(self.documents)
+        score = 0.0
+        for term in query_terms:
+            postings = self.postings[term]
+            idf = math.log(
+                (count - len(postings) + 0.5) / (len(postings) + 0.5) + 1)
+            frequency = postings[rowid]
+            score += idf * frequency * (self.k1 + 1) / (
+                frequency + self.k1 * (
+                    1 - self.b + self.b * length / average_length))
+        # Как и bm25() в FTS5: чем меньше, тем релевантнее.
+        return -score
+
+    def search(self, query_terms, after, limit):
+        self._ensure_built()
+        with self.lock:
+            if any(term not in self.postings for term in query_terms):
+                return []
+            rowids = set.intersection(
+                *(set(self.postings[term]) for term in query_terms))
+            average_length = self.total_length / len(self.documents)
+            scores = {}
+            for rowid in rowids:
+                post_id = self.documents[rowid][0]
+                score = self._score(rowid, query_terms, average_length)
+                scores[post_id] = min(score, scores.get(post_id, score))
+        results = sorted((score, post_id) for post_id, score in scores.items())
+        if after is not None:
+            results = [key for key in results if key > tuple(after)]
+        return results[:limit]
+
+    def rebuild(self):
+        with self.lock:
+            self._reset()
+            self._ensure_built()
+
+
+_memory_index = InvertedIndex()
+_fts5_backend = Fts5Backend()
+_fts5_ready = None
+
+
+def get_backend():
+    global _fts5_ready
+    if settings.SEARCH_BACKEND == 'memory':
+        return _memory_index
+    if _fts5_ready is None:
+        _fts5_ready = (
+            fts5_available(connection)
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _fts5_backend if _fts5_ready else _memory_index
+
+
+class SearchPage(CursorPage):
+    def __init__(self, object_list, last_key, has_next, cursor=None):
+        super().__init__(object_list, has_next, bool(cursor), cursor)
+        self.last_key = last_key
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return signing.dumps(self.last_key, salt=SEARCH_CURSOR_SALT)
+
+    @property
+    def previous_cursor(self):
+        return None
+
+
+def decode_search_cursor(cursor):
+    try:
+        score, post_id = signing.loads(cursor, salt=SEARCH_CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if not isinstance(score, (int, float)) or not isinstance(post_id, int):
+        return None
+    return score, post_id
+
+
+def search_posts(query, cursor=None):
+    per_page = settings.POST_COUNT_DISPLAY
+    query_terms = list(dict.fromkeys(terms(query)))
+    if not query_terms:
+        return SearchPage([], None, False)
+    after = decode_search_cursor(cursor) if cursor else None
+    keys = get_backend().search(query_terms, after, per_page + 1)
+    has_next = len(keys) > per_page
+    keys = keys[:per_page]
+    posts = get_feed_queryset().in_bulk([post_id for _, post_id in keys])
+    object_list = [posts[post_id] for _, post_id in keys if post_id in posts]
+    last_key = list(keys[-1]) if keys else None
+    return SearchPage(object_list, last_key, has_next, cursor)
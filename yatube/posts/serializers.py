@@ -0,0 +1,37 @@
+from rest_framework import serializers
+
+from .models import Post, Comment
+
+
+class SelectableFieldsMixin:
+    """Оставляет только поля из context['fields'], если он передан."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('fields')
+        if selected:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+
+class PostSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        slug_field='username', read_only=True)
+    group = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    image = serializers.ImageField(use_url=True, read_only=True)
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'text', 'pub_date', 'author', 'group', 'image',
+            'image_width', 'image_height',
+        )
+
+
+class CommentSerializer(SelectableFieldsMixin, serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        slug_field='username', read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'post', 'author', 'text', 'created')
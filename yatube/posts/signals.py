@@ -0,0 +1,216 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import (
+    pre_save, post_save, pre_delete, post_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counters, feed_cache, search, timeline
+from .models import Post, Group, Comment, Follow
+
+User = get_user_model()
+
+# Пользователи, которых удаляет текущий поток
+_deleting = threading.local()
+
+# Поля группы и автора, которые попадают в карточку поста
+GROUP_CARD_FIELDS = ('title', 'slug')
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def _card_fields(instance, fields):
+    return tuple(getattr(instance, field) for field in fields)
+
+
+def _remember_card_fields(instance, fields, update_fields):
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    instance._previous_card = type(instance).objects.filter(
+        pk=instance.pk).values_list(*fields).first()
+
+
+def _card_changed(instance, fields):
+    previous = getattr(instance, '_previous_card', None)
+    return previous is not None and previous != _card_fields(instance, fields)
+
+
+def touch_posts(posts):
+    """Сбрасывает кеш карточек: update() не трогает auto_now сам."""
+    return posts.update(updated=timezone.now())
+
+
+@receiver(pre_save, sender=Post)
+def post_remember_group(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._previous_group_id = Post.objects.filter(
+            pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_update_counters(sender, instance, created, **kwargs):
+    if created:
+        counters.change_index_count(1)
+        counters.change_author_count(instance.author_id, 1)
+        counters.change_group_count(instance.group_id, 1)
+        return
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if previous_group_id != instance.group_id:
+        counters.change_group_count(previous_group_id, -1)
+        counters.change_group_count(instance.group_id, 1)
+
+
+@receiver(pre_delete, sender=User)
+def author_remember_delete(sender, instance, **kwargs):
+    # В Django 2.2 у post_delete нет origin: посты, удаляемые вместе с
+    # автором, узнаются по этому списку.
+    _deleting.authors = getattr(_deleting, 'authors', set()) | {instance.pk}
+
+
+@receiver(post_delete, sender=User)
+def author_forget_delete(sender, instance, **kwargs):
+    _deleting.authors = getattr(_deleting, 'authors', set()) - {instance.pk}
+
+
+@receiver(post_delete, sender=Post)
+def post_delete_counters(sender, instance, **kwargs):
+    counters.change_index_count(-1)
+    if instance.author_id not in getattr(_deleting, 'authors', ()):
+        counters.change_author_count(instance.author_id, -1)
+    counters.change_group_count(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def post_bump_feeds(sender, instance, **kwargs):
+    feed_cache.bump_post(
+        instance,
+        getattr(instance, '_previous_group_id', None),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def post_delete_bump_feeds(sender, instance, **kwargs):
+    feed_cache.bump_post(instance)
+
+
+def _group_authors(group):
+    return list(group.posts.values_list('author', flat=True).distinct())
+
+
+def _bump_group_feeds(group_id, author_ids):
+    feed_cache.bump('index')
+    feed_cache.bump('group', group_id)
+    for author_id in author_ids:
+        feed_cache.bump('author', author_id)
+
+
+@receiver(post_save, sender=Group)
+def group_bump_feeds(sender, instance, created, **kwargs):
+    if not created:
+        _bump_group_feeds(instance.pk, _group_authors(instance))
+
+
+@receiver(pre_delete, sender=Group)
+def group_delete_touch_posts(sender, instance, **kwargs):
+    # Посты остаются без группы через update(), который не трогает updated.
+    instance._previous_authors = _group_authors(instance)
+    touch_posts(instance.posts.all())
+
+
+@receiver(post_delete, sender=Group)
+def group_delete_bump_feeds(sender, instance, **kwargs):
+    _bump_group_feeds(
+        instance.pk, getattr(instance, '_previous_authors', ()))
+
+
+@receiver(pre_save, sender=Group)
+def group_remember_card(sender, instance, update_fields=None, **kwargs):
+    _remember_card_fields(instance, GROUP_CARD_FIELDS, update_fields)
+
+
+def _bump_post_feeds(post_ids):
+    # Slug группы и имя автора выводятся и в API поста, и в его комментариях.
+    for post_id in post_ids:
+        feed_cache.bump('post', post_id)
+
+
+@receiver(post_save, sender=Group)
+def group_touch_posts(sender, instance, created, **kwargs):
+    if not created and _card_changed(instance, GROUP_CARD_FIELDS):
+        touch_posts(instance.posts.all())
+        _bump_post_feeds(instance.posts.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=User)
+def author_create_counter(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.create_author_count(instance)
+
+
+@receiver(pre_save, sender=User)
+def author_remember_card(sender, instance, update_fields=None, **kwargs):
+    _remember_card_fields(instance, AUTHOR_CARD_FIELDS, update_fields)
+
+
+@receiver(post_save, sender=User)
+def author_touch_posts(sender, instance, created, **kwargs):
+    if created or not _card_changed(instance, AUTHOR_CARD_FIELDS):
+        return
+    touch_posts(instance.posts.all())
+    feed_cache.bump('index')
+    feed_cache.bump('author', instance.pk)
+    _bump_post_feeds(Post.objects.filter(
+        Q(author=instance) | Q(comments__author=instance)
+    ).values_list('id', flat=True).distinct())
+    groups = instance.posts.exclude(group=None).values_list(
+        'group', flat=True).distinct()
+    for group_id in groups:
+        feed_cache.bump('group', group_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_bump_feeds(sender, instance, **kwargs):
+    feed_cache.bump('post', instance.post_id)
+
+
+@receiver(post_save, sender=Post)
+def post_fan_out(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Follow)
+def follow_add_to_timeline(sender, instance, created, **kwargs):
+    if created and not instance.backfilled:
+        timeline.follow_added(instance)
+        feed_cache.bump('follow', instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_remove_from_timeline(sender, instance, **kwargs):
+    timeline.follow_removed(instance)
+    feed_cache.bump('follow', instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+def post_update_search(sender, instance, **kwargs):
+    search.get_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_delete_search(sender, instance, **kwargs):
+    search.get_backend().remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_update_search(sender, instance, **kwargs):
+    search.get_backend().index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_delete_search(sender, instance, **kwargs):
+    search.get_backend().remove_comment(instance.pk)
@@ -0,0 +1,88 @@
+"""Стеммер Портера (Snowball) для русского языка и разбиение на термы."""
+import re
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = re.compile(
+    r'((?<=[ая])(в|вши|вшись)|(ив|ивши|ившись|ыв|ывши|ывшись))$'
+)
+REFLEXIVE = re.compile(r'(ся|сь)$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|'
+    r'ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE = re.compile(r'((?<=[ая])(ем|нн|вш|ющ|щ)|(ивш|ывш|ующ))$')
+VERB = re.compile(
+    r'((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)|'
+    r'(ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|'
+    r'ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю))$'
+)
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|'
+    r'ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL = re.compile(r'(ост|ость)$')
+SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+CYRILLIC = re.compile(r'[а-я]')
+WORD = re.compile(r'\w+')
+# Словарь живого текста невелик, а стемминг слова — десяток регулярок.
+STEM_CACHE_SIZE = 50000
+
+
+def _region(word, start):
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _cut(pattern, word):
+    return pattern.sub('', word, count=1)
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    match = re.search(f'[{VOWELS}]', word)
+    if match is None or not CYRILLIC.search(word):
+        return word
+    prefix, rv = word[:match.end()], word[match.end():]
+    r2 = _region(word, _region(word, 0))
+
+    cut = _cut(PERFECTIVE_GERUND, rv)
+    if cut != rv:
+        rv = cut
+    else:
+        rv = _cut(REFLEXIVE, rv)
+        cut = _cut(ADJECTIVE, rv)
+        if cut != rv:
+            rv = _cut(PARTICIPLE, cut)
+        else:
+            cut = _cut(VERB, rv)
+            rv = cut if cut != rv else _cut(NOUN, rv)
+
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    match = DERIVATIONAL.search(rv)
+    if match and len(prefix) + match.start() >= r2:
+        rv = rv[:match.start()]
+
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        cut = _cut(SUPERLATIVE, rv)
+        if cut != rv:
+            rv = cut[:-1] if cut.endswith('нн') else cut
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+    return prefix + rv
+
+
+def terms(text):
+    return [stem(word) for word in WORD.findall(text.lower())]
+
+
+def stem_text(text):
+    return ' '.join(terms(text))
@@ -0,0 +1,223 @@
+import hashlib
+import io
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import condition
+
+from .conditional import (
+    group_last_modified, group_versions, index_last_modified,
+    index_versions, profile_last_modified, profile_versions,
+)
+from .models import Group
+from .utils import get_feed_queryset
+
+User = get_user_model()
+
+# Поднимается при изменении разметки лент, чтобы сбросить кеш и ETag
+SYNDICATION_VERSION = 1
+SYNDICATION_KEY = 'syndication:{}'
+# Столько постов уходит клиенту одним куском потокового ответа
+FLUSH_ITEMS = 10
+
+
+def _drain(buffer):
+    content = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return content.encode()
+
+
+class StreamingFeedMixin:
+    """Отдаёт ленту кусками: шапку, посты по FLUSH_ITEMS, затем хвост."""
+
+    item_element = 'item'
+
+    def __init__(self, *args, last_modified=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_modified = last_modified
+
+    def latest_post_date(self):
+        # Посты ещё не выбраны, дату последнего уже знает Last-Modified.
+        return self.last_modified or super().latest_post_date()
+
+    def make_item(self, **kwargs):
+        self.add_item(**kwargs)
+        return self.items.pop()
+
+    def stream(self, items):
+        buffer = io.StringIO()
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+        self.start(handler)
+        yield _drain(buffer)
+        for count, item in enumerate(items, 1):
+            handler.startElement(
+                self.item_element, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            if count % FLUSH_ITEMS == 0:
+                yield _drain(buffer)
+        self.finish(handler)
+        yield _drain(buffer)
+
+
+class RssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    def start(self, handler):
+        handler.startDocument()
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def finish(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class AtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_element = 'entry'
+
+    def start(self, handler):
+        handler.startDocument()
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def finish(self, handler):
+        handler.endElement('feed')
+
+
+FEED_TYPES = {
+    'rss': RssFeed,
+    'atom': AtomFeed,
+}
+
+
+def _key(request, kind, versions):
+    # Ссылки в ленте абсолютные, поэтому в ключе и хост.
+    key = repr((
+        SYNDICATION_VERSION,
+        request.build_absolute_uri(request.path),
+        kind,
+        versions,
+    ))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _post_item(request, post):
+    link = request.build_absolute_uri(
+        reverse('posts:post_detail', args=[post.pk]))
+    author = post.author
+    return {
+        'title': Truncator(post.text).chars(60),
+        'link': link,
+        'unique_id': link,
+        'description': linebreaks(post.text, autoescape=True),
+        'author_name': author.get_full_name() or author.username,
+        'author_link': request.build_absolute_uri(
+            reverse('posts:profile', args=[author.username])),
+        'pubdate': post.pub_date,
+        'categories': [post.group.slug] if post.group_id else (),
+    }
+
+
+def _cache_stream(chunks, key):
+    # В кеш попадает только целиком отданная лента.
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(
+        SYNDICATION_KEY.format(key),
+        b''.join(parts),
+        settings.FEED_CACHE_TIMEOUT,
+    )
+
+
+def syndication(versions_func, last_modified_func):
+    """
+    Превращает view, который описывает ленту, в RSS/Atom-ответ: 304 по
+    поколению ленты, готовый XML из кеша или поток из .iterator().
+    """
+    def decorator(view):
+        def etag_func(request, kind, **kwargs):
+            versions = versions_func(request, **kwargs)
+            if versions is None or kind not in FEED_TYPES:
+                return None
+            return '"' + _key(request, kind, versions) + '"'
+
+        @condition(
+            etag_func=etag_func,
+            last_modified_func=lambda request, kind, **kwargs: (
+                last_modified_func(request, **kwargs)),
+        )
+        @wraps(view)
+        def wrapper(request, kind, **kwargs):
+            feed_class = FEED_TYPES.get(kind)
+            versions = versions_func(request, **kwargs)
+            if feed_class is None or versions is None:
+                raise Http404
+            key = _key(request, kind, versions)
+            content = cache.get(SYNDICATION_KEY.format(key))
+            if content is not None:
+                return HttpResponse(
+                    content, content_type=feed_class.content_type)
+            description, posts_list = view(request, **kwargs)
+            feed = feed_class(
+                feed_url=request.build_absolute_uri(),
+                language='ru',
+                last_modified=last_modified_func(request, **kwargs),
+                **description,
+            )
+            posts = get_feed_queryset(posts_list)[:settings.FEED_ITEMS]
+            items = (
+                feed.make_item(**_post_item(request, post))
+                for post in posts.iterator()
+            )
+            return StreamingHttpResponse(
+                _cache_stream(feed.stream(items), key),
+                content_type=feed.content_type,
+            )
+        return wrapper
+    return decorator
+
+
+@syndication(index_versions, index_last_modified)
+def index_feed(request):
+    description = {
+        'title': 'Yatube',
+        'link': request.build_absolute_uri(reverse('posts:index')),
+        'description': 'Последние обновления на сайте',
+    }
+    return description, None
+
+
+@syndication(group_versions, group_last_modified)
+def group_feed(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    description = {
+        'title': f'Yatube: {group.title}',
+        'link': request.build_absolute_uri(
+            reverse('posts:group_posts_page', args=[slug])),
+        'description': group.description,
+    }
+    return description, group.posts.all()
+
+
+@syndication(profile_versions, profile_last_modified)
+def profile_feed(request, username):
+    author = get_object_or_404(User, username=username)
+    description = {
+        'title': f'Yatube: {author.get_full_name() or author.username}',
+        'link': request.build_absolute_uri(
+            reverse('posts:profile', args=[username])),
+        'description': f'Записи пользователя {author.username}',
+    }
+    return description, author.posts.all()
@@ -0,0 +1,183 @@
+from urllib.parse import quote
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
+from django.utils.safestring import mark_safe
+
+from posts.feed_cache import get_feed_versions
+from posts.thumbnails import get_missed_count, mark_missed
+
+register = template.Library()
+
+FEED_TEMPLATE = 'posts/post_list.html'
+# Ссылки, которые выводит post_list.html, по коротким именам
+FEED_URLS = {
+    'profile': 'posts:profile',
+    'post_detail': 'posts:post_detail',
+    'group': 'posts:group_posts_page',
+}
+# Подходит и для int, и для slug, и для str в адресе
+URL_SENTINEL = '9081726354'
+# Поднимается при изменении post_list.html, чтобы сбросить кеш карточек
+POST_HTML_VERSION = 1
+POST_HTML_KEY = 'post:html:{}:{}:{}'
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, scope, scope_id, vary_on):
+        self.nodelist = nodelist
+        self.scope = scope
+        self.scope_id = scope_id
+        self.vary_on = vary_on
+
+    def render(self, context):
+        scope = self.scope.resolve(context)
+        scope_id = self.scope_id.resolve(context) if self.scope_id else None
+        versions = get_feed_versions(scope, scope_id)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        cache_key = make_template_fragment_key(
+            f'feed.{scope}.{scope_id}',
+            versions + vary_on,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            value, pending = cached
+            if pending:
+                # Во фрагменте остались заглушки миниатюр.
+                mark_missed()
+            return value
+        missed = get_missed_count()
+        value = self.nodelist.render(context)
+        pending = get_missed_count() != missed
+        timeout = settings.FEED_CACHE_TIMEOUT
+        if pending:
+            timeout = settings.THUMBNAIL_PENDING_CACHE_TIMEOUT
+        cache.set(cache_key, (value, pending), timeout)
+        return value
+
+
+@register.tag
+def feedcache(parser, token):
+    """
+    Кеширует фрагмент ленты до следующего изменения её поколения.
+
+        {% feedcache 'index' on page_obj.number %}
+        {% feedcache 'group' group.pk on page_obj.number %}
+    """
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    bits = token.split_contents()[1:]
+    if 'on' in bits:
+        index = bits.index('on')
+        bits, vary_on = bits[:index], bits[index + 1:]
+    else:
+        vary_on = []
+    if len(bits) not in (1, 2):
+        raise template.TemplateSyntaxError(
+            "'feedcache' ожидает ленту и, при необходимости, её id"
+        )
+    scope = parser.compile_filter(bits[0])
+    scope_id = parser.compile_filter(bits[1]) if len(bits) == 2 else None
+    return FeedCacheNode(
+        nodelist,
+        scope,
+        scope_id,
+        [parser.compile_filter(var) for var in vary_on],
+    )
+
+
+def feed_url_prefixes():
+    """Части адресов вокруг аргумента: reverse() один раз на страницу."""
+    prefixes = {}
+    for name, view in FEED_URLS.items():
+        url = reverse(view, args=[URL_SENTINEL])
+        prefixes[name] = tuple(url.split(URL_SENTINEL))
+    return prefixes
+
+
+@register.simple_tag(takes_context=True)
+def feed_url(context, name, value):
+    """
+    Адрес из FEED_URLS. Внутри render_feed склеивается из готовых
+    частей, в остальных шаблонах равен обычному {% url %}.
+
+        {% feed_url 'profile' post.author.username %}
+    """
+    prefixes = context.get('feed_urls')
+    if prefixes is None:
+        return reverse(FEED_URLS[name], args=[value])
+    prefix, suffix = prefixes[name]
+    # Экранирование то же, что у reverse().
+    return prefix + quote(str(value), safe=RFC3986_SUBDELIMS + '/~:@') + suffix
+
+
+class RenderedFeed(list):
+    """Отрисованные посты; в шаблоне выводятся одной строкой."""
+
+    def __html__(self):
+        return ''.join(self)
+
+    __str__ = __html__
+
+
+def post_html_key(post):
+    # Карточка зависит только от поста: ключ общий для всех лент.
+    return POST_HTML_KEY.format(
+        POST_HTML_VERSION, post.pk, post.updated.timestamp())
+
+
+def render_post(template, context, post):
+    context['post'] = post
+    with context.render_context.push_state(template):
+        return mark_safe(template.nodelist.render(context))
+
+
+def _render_missing(context, posts):
+    """Карточки постов, которых нет в кеше, и флаги заглушек миниатюр."""
+    feed_template = context.template.engine.get_template(FEED_TEMPLATE)
+    rendered = {}
+    with context.push(feed_urls=feed_url_prefixes()):
+        for key, post in posts.items():
+            missed = get_missed_count()
+            html = render_post(feed_template, context, post)
+            rendered[key] = (html, get_missed_count() != missed)
+    return rendered
+
+
+@register.simple_tag(takes_context=True)
+def render_feed(context, posts):
+    """
+    Выводит посты через post_list.html за один проход вместо
+    {% for %} с {% include %}. Готовые карточки берутся из кеша одним
+    запросом, остальные рендерятся: шаблон ищется один раз, а ссылки
+    собираются из частей, вычисленных один раз на страницу.
+
+        {% render_feed page_obj %}
+        {% render_feed page_obj as feed %}
+        {% for post_html in feed %}...{% empty %}...{% endfor %}
+    """
+    posts = [(post_html_key(post), post) for post in posts]
+    cached = cache.get_many([key for key, _ in posts])
+    missing = {key: post for key, post in posts if key not in cached}
+    if missing:
+        rendered = _render_missing(context, missing)
+        cached.update(rendered)
+        ready = {}
+        pending = {}
+        for key, value in rendered.items():
+            (pending if value[1] else ready)[key] = value
+        cache.set_many(ready, settings.FEED_CACHE_TIMEOUT)
+        if pending:
+            cache.set_many(pending, settings.THUMBNAIL_PENDING_CACHE_TIMEOUT)
+    feed = RenderedFeed()
+    for key, _ in posts:
+        html, pending = cached[key]
+        if pending and key not in missing:
+            # В карточке из кеша осталась заглушка миниатюры.
+            mark_missed()
+        feed.append(mark_safe(html))
+    return feed
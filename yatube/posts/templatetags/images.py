@@ -0,0 +1,18 @@
+from django import template
+
+from posts.images import RENDITION_SIZE, rendition_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_rendition(post):
+    """Адреса готовых копий картинки или None, если их ещё нет."""
+    if not post.image or post.image_width is None:
+        return None
+    width, height = RENDITION_SIZE
+    return {
+        'width': width,
+        'height': height,
+        **rendition_urls(post.image.name),
+    }
@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post, Group, Comment, Follow
+
+User = get_user_model()
+
+
+class FeedApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        cls.group = Group.objects.create(
+            title='test_group',
+            description='test_desc',
+            slug='test_slug'
+        )
+        Follow.objects.create(user=cls.user, author=cls.user_author)
+        for i in range(settings.POST_COUNT_DISPLAY + 3):
+            cls.post = Post.objects.create(
+                text=f'test text post number {i}',
+                author=cls.user_author,
+                group=cls.group,
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.user, text='test comment')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feeds_are_paginated_by_cursor(self):
+        pages = {
+            'api_index': {},
+            'api_group_posts': {'slug': self.group.slug},
+            'api_profile': {'username': self.user_author.username},
+            'api_follow_index': {},
+        }
+        for name, kwargs in pages.items():
+            with self.subTest(page=name):
+                response = self.authorized_client.get(
+                    reverse(f'posts:{name}', kwargs=kwargs))
+                data = response.json()
+                self.assertEqual(
+                    len(data['results']), settings.POST_COUNT_DISPLAY)
+                self.assertEqual(data['results'][0]['id'], self.post.id)
+                self.assertEqual(
+                    data['results'][0]['author'], self.user_author.username)
+                self.assertIsNone(data['previous'])
+                data = self.authorized_client.get(data['next']).json()
+                self.assertEqual(len(data['results']), 3)
+                self.assertIsNone(data['next'])
+
+    def test_follow_feed_requires_login(self):
+        response = self.client.get(reverse('posts:api_follow_index'))
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_fields_selection(self):
+        response = self.client.get(
+            reverse('posts:api_post_detail', kwargs={'post_id': self.post.id}),
+            {'fields': 'id,text'},
+        )
+        self.assertEqual(
+            response.json(), {'id': self.post.id, 'text': self.post.text})
+
+    def test_etag_not_modified_until_feed_changes(self):
+        page = reverse('posts:api_post_comments',
+                       kwargs={'post_id': self.post.id})
+        response = self.client.get(page)
+        self.assertEqual(response.json()['results'][0]['text'], 'test comment')
+        etag = response['ETag']
+        response = self.client.get(page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='new comment')
+        response = self.client.get(page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_on_rename(self):
+        pages = [
+            reverse('posts:api_post_detail',
+                    kwargs={'post_id': self.post.id}),
+            reverse('posts:api_post_comments',
+                    kwargs={'post_id': self.post.id}),
+        ]
+        etags = {page: self.client.get(page)['ETag'] for page in pages}
+        renames = (
+            (Group.objects.get(pk=self.group.pk), 'slug', 'new_slug'),
+            (User.objects.get(pk=self.user_author.pk), 'username',
+             'new_author'),
+            (User.objects.get(pk=self.user.pk), 'username', 'new_commenter'),
+        )
+        for instance, field, value in renames:
+            setattr(instance, field, value)
+            instance.save()
+            for page in pages:
+                with self.subTest(field=field, value=value, page=page):
+                    response = self.client.get(
+                        page, HTTP_IF_NONE_MATCH=etags[page])
+                    self.assertEqual(response.status_code, 200)
+                    etags[page] = response['ETag']
+
+    def test_output_is_compact_and_gzipped(self):
+        response = self.client.get(
+            reverse('posts:api_index'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = self.client.get(reverse('posts:api_index'))
+        self.assertNotIn(b', "', response.content)
@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from users.models import Profile
+
+from ..counters import get_index_count
+from ..models import Post, Group, Follow, TimelineEntry
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class PostsImportExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        for i in range(5):
+            Post.objects.create(
+                text=f'Пост номер {i} про котиков',
+                author=self.author,
+                group=self.group if i % 2 else None,
+            )
+
+    def call(self, name, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(name, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue()
+
+    def round_trip(self, filename):
+        path = os.path.join(self.directory, filename)
+        self.call('export_posts', path, '--chunk-size', '2')
+        exported = list(Post.objects.order_by('id').values_list(
+            'text', 'author', 'group', 'pub_date'))
+        Post.objects.all().delete()
+
+        self.call('import_posts', path, '--chunk-size', '2')
+
+        imported = list(Post.objects.order_by('id').values_list(
+            'text', 'author', 'group', 'pub_date'))
+        self.assertEqual(imported, exported)
+        self.assertEqual(get_index_count(), 5)
+        self.assertEqual(Profile.objects.get(user=self.author).posts_count, 5)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 2)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 5)
+        self.assertEqual(len(search_posts('котиков').object_list), 5)
+
+    def test_ndjson_round_trip(self):
+        self.round_trip('posts.ndjson')
+
+    def test_csv_round_trip(self):
+        self.round_trip('posts.csv')
+
+    def test_unknown_author_and_group(self):
+        path = os.path.join(self.directory, 'new.ndjson')
+        rows = [
+            {'author': 'stranger', 'group': '', 'text': 'Первый'},
+            {'author': 'author', 'group': 'new-group', 'text': 'Второй'},
+        ]
+        with open(path, 'w', encoding='utf-8') as stream:
+            for row in rows:
+                stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+        self.call('import_posts', path)
+        self.assertFalse(Post.objects.filter(
+            text__in=['Первый', 'Второй']).exists())
+
+        self.call('import_posts', path, '--create-missing')
+        self.assertTrue(Post.objects.filter(
+            text='Первый', author__username='stranger').exists())
+        self.assertTrue(Post.objects.filter(
+            text='Второй', group__slug='new-group').exists())
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post, Group, Comment
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        cls.group = Group.objects.create(
+            title='test_group',
+            description='test_desc',
+            slug='test_slug'
+        )
+        cls.post = Post.objects.create(
+            text='test text',
+            author=cls.user_author,
+            group=cls.group,
+        )
+        cls.pages = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_posts_page',
+                             kwargs={'slug': cls.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': cls.user_author}),
+            'post_detail': reverse('posts:post_detail',
+                                   kwargs={'post_id': cls.post.id}),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_not_modified_without_rendering(self):
+        for name, page in self.pages.items():
+            with self.subTest(page=name):
+                response = self.client.get(page)
+                self.assertIn('Cookie', response['Vary'])
+                self.assertTrue(response.has_header('Last-Modified'))
+                response = self.client.get(
+                    page, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+                self.assertIsNone(response.context)
+
+    def test_etag_changes_with_content(self):
+        etags = {
+            name: self.client.get(page)['ETag']
+            for name, page in self.pages.items()
+        }
+        Comment.objects.create(
+            post=self.post, author=self.user, text='test comment')
+        response = self.client.get(
+            self.pages['post_detail'],
+            HTTP_IF_NONE_MATCH=etags['post_detail'],
+        )
+        self.assertContains(response, 'test comment')
+        Post.objects.create(
+            text='new post', author=self.user_author, group=self.group)
+        for name in ('index', 'group', 'profile'):
+            with self.subTest(page=name):
+                response = self.client.get(
+                    self.pages[name], HTTP_IF_NONE_MATCH=etags[name])
+                self.assertContains(response, 'new post')
+
+    def test_etag_differs_per_user(self):
+        page = self.pages['index']
+        etag = self.client.get(page)['ETag']
+        response = self.authorized_client.get(page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_with_csrf_cookie(self):
+        page = self.pages['post_detail']
+        self.authorized_client.cookies['csrftoken'] = 'a' * 64
+        response = self.authorized_client.get(page)
+        self.assertFalse(response.has_header('Last-Modified'))
+        etag = response['ETag']
+        # Новый вход меняет секрет: форма комментария в кеше устарела.
+        self.authorized_client.cookies['csrftoken'] = 'b' * 64
+        response = self.authorized_client.get(page, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_changes_on_delete(self):
+        cache.set('feed:changed:index:', timezone.now() - timedelta(hours=1))
+        page = self.pages['index']
+        last_modified = self.client.get(page)['Last-Modified']
+        response = self.client.get(
+            page, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.filter(pk=self.post.pk).delete()
+        response = self.client.get(
+            page, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import Profile
+
+from ..counters import get_index_count, get_author_count, get_follow_count
+from ..models import Post, Group, Counter, Follow, Comment
+
+User = get_user_model()
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        cls.group_one = Group.objects.create(
+            title='test_group_one',
+            description='test_desc_one',
+            slug='test_slug_one'
+        )
+        cls.group_two = Group.objects.create(
+            title='test_group_two',
+            description='test_desc_two',
+            slug='test_slug_two'
+        )
+        for i in range(3):
+            Post.objects.create(
+                text=f'test text post number {i}',
+                author=cls.user_author,
+                group=cls.group_one,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counters_follow_create_edit_delete(self):
+        self.group_one.refresh_from_db()
+        self.assertEqual(self.group_one.posts_count, 3)
+        self.assertEqual(get_index_count(), 3)
+
+        post = Post.objects.filter(group=self.group_one).first()
+        post.group = self.group_two
+        post.save()
+        self.group_one.refresh_from_db()
+        self.group_two.refresh_from_db()
+        self.assertEqual(self.group_one.posts_count, 2)
+        self.assertEqual(self.group_two.posts_count, 1)
+
+        post.delete()
+        self.group_two.refresh_from_db()
+        self.user_author.refresh_from_db()
+        self.assertEqual(self.group_two.posts_count, 0)
+        self.assertEqual(get_index_count(), 2)
+        self.assertEqual(get_author_count(self.user_author), 2)
+
+    def test_feeds_do_not_count_posts(self):
+        pages = [
+            reverse('posts:index'),
+            reverse('posts:group_posts_page',
+                    kwargs={'slug': self.group_one.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.user_author.username}),
+        ]
+        get_index_count()
+        get_author_count(self.user_author)
+        for page in pages:
+            with self.subTest(page=page):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(page)
+                self.assertEqual(
+                    response.context['page_obj'].paginator.count, 3)
+                count_queries = [
+                    query['sql'] for query in context.captured_queries
+                    if 'COUNT(' in query['sql']
+                ]
+                self.assertEqual(count_queries, [])
+
+    def test_counters_are_read_without_writes(self):
+        Counter.objects.all().delete()
+        self.user_author.profile.delete()
+        author = User.objects.get(pk=self.user_author.pk)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(get_index_count(), 3)
+            self.assertEqual(get_author_count(author), 3)
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if not query['sql'].startswith('SELECT')
+        ]
+        self.assertEqual(writes, [])
+
+    def test_follow_index_uses_author_counters(self):
+        user = User.objects.create_user(username='test_user_follower')
+        Follow.objects.create(user=user, author=self.user_author)
+        self.assertEqual(get_follow_count(user), 3)
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+        count_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'COUNT(*)' in query['sql']
+        ]
+        self.assertEqual(count_queries, [])
+
+    def test_author_with_posts_is_deleted(self):
+        author = User.objects.create_user(username='test_user_deleted')
+        post = Post.objects.create(
+            text='post of deleted author',
+            author=author,
+            group=self.group_one,
+        )
+        Comment.objects.create(post=post, author=author, text='comment')
+        Comment.objects.create(
+            post=Post.objects.filter(author=self.user_author).first(),
+            author=author, text='comment on other post')
+
+        author.delete()
+
+        self.assertFalse(User.objects.filter(pk=author.pk).exists())
+        self.assertFalse(Profile.objects.filter(user_id=author.pk).exists())
+        self.group_one.refresh_from_db()
+        self.assertEqual(self.group_one.posts_count, 3)
+        self.assertEqual(get_index_count(), 3)
@@ -0,0 +1,176 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.jobs import work
+
+from ..images import rendition_name
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+ORIENTATION = 0x0112
+MAKE = 0x010F
+
+
+def make_jpeg(size=(400, 200), orientation=None):
+    image = Image.new('RGB', size, (200, 10, 10))
+    exif = Image.Exif()
+    exif[MAKE] = 'Camera'
+    if orientation:
+        exif[ORIENTATION] = orientation
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def make_animation(image_format, size=(400, 200), frames=3):
+    images = [
+        Image.new('RGB', size, (50 * index, 10, 10))
+        for index in range(frames)
+    ]
+    exif = Image.Exif()
+    exif[MAKE] = 'Camera'
+    buffer = BytesIO()
+    images[0].save(
+        buffer, image_format, save_all=True, append_images=images[1:],
+        duration=50, loop=0, exif=exif.tobytes(),
+        comment=b'private', xmp=b'<x:xmpmeta>private</x:xmpmeta>',
+    )
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImagePipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def upload(self, content, name='photo.jpg'):
+        return self.client.post(reverse('posts:post_create'), data={
+            'text': 'post with image',
+            'image': SimpleUploadedFile(name, content, 'image/jpeg'),
+        })
+
+    def media(self, name):
+        return os.path.join(TEMP_MEDIA_ROOT, name)
+
+    def test_upload_is_normalized(self):
+        self.upload(make_jpeg(orientation=6))
+        post = Post.objects.get()
+        # Копии и размеры строит фоновая задача.
+        self.assertIsNone(post.image_width)
+        work(once=True)
+        post.refresh_from_db()
+        self.assertEqual((post.image_width, post.image_height), (200, 400))
+        with Image.open(self.media(post.image.name)) as image:
+            self.assertEqual(image.size, (200, 400))
+            self.assertFalse(image.getexif())
+        for kind, image_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+            with self.subTest(kind=kind):
+                path = self.media(rendition_name(post.image.name, kind))
+                with Image.open(path) as image:
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.size, (960, 339))
+
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk]))
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, 'width="960" height="339"')
+
+    @override_settings(IMAGE_MAX_SIDE=100)
+    def test_large_upload_is_downscaled(self):
+        self.upload(make_jpeg())
+        work(once=True)
+        post = Post.objects.get()
+        self.assertEqual((post.image_width, post.image_height), (100, 50))
+
+    @override_settings(IMAGE_MAX_SIDE=100)
+    def test_animation_is_downscaled_and_stripped(self):
+        for image_format in ('GIF', 'WEBP'):
+            with self.subTest(image_format=image_format):
+                name = f'animation.{image_format.lower()}'
+                self.upload(make_animation(image_format), name)
+                post = Post.objects.latest('pk')
+                with Image.open(self.media(post.image.name)) as image:
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.n_frames, 3)
+                    self.assertEqual(image.size, (100, 50))
+                    self.assertFalse(image.getexif())
+                    self.assertNotIn('xmp', image.info)
+                    self.assertNotIn('comment', image.info)
+
+    @override_settings(IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_upload_over_size_limit(self):
+        response = self.upload(make_jpeg())
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(response.context['form'].errors['image'])
+
+    @override_settings(IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_admin_upload_over_size_limit(self):
+        admin = User.objects.create_superuser(
+            'test_admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        content = make_jpeg()
+        response = self.client.post(reverse('admin:posts_post_add'), data={
+            'text': 'post from admin',
+            'author': admin.pk,
+            'image': SimpleUploadedFile('photo.jpg', content, 'image/jpeg'),
+            'comments-TOTAL_FORMS': 0,
+            'comments-INITIAL_FORMS': 0,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['adminform'].form.errors['image'])
+        self.assertFalse(Post.objects.exists())
+
+    def test_upload_view_checks_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'), data={
+            'text': 'post without token',
+            'image': SimpleUploadedFile('photo.jpg', make_jpeg()),
+        })
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(IMAGE_MAX_PIXELS=1000)
+    def test_upload_over_pixel_limit(self):
+        response = self.upload(make_jpeg())
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(response.context['form'].errors['image'])
+
+    def test_process_images_command(self):
+        post = Post.objects.create(
+            text='imported',
+            author=self.user,
+            image=SimpleUploadedFile('imported.jpg', make_jpeg()),
+        )
+        self.assertIsNone(post.image_width)
+        call_command('process_images', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual((post.image_width, post.image_height), (400, 200))
+        self.assertTrue(os.path.exists(
+            self.media(rendition_name(post.image.name, 'webp'))))
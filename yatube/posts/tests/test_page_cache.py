@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post, Group, Comment
+
+User = get_user_model()
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            description='test_desc',
+            slug='test_slug'
+        )
+        cls.post = Post.objects.create(
+            text='test text',
+            author=cls.user,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_anonymous_pages_served_from_cache(self):
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_posts_page', kwargs={'slug': 'test_slug'}),
+            reverse('posts:profile', kwargs={'username': 'test_user'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('about:author'),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                first = self.client.get(page)
+                # Остаётся только выборка для ETag и Last-Modified.
+                with CaptureQueriesContext(connection) as context:
+                    second = self.client.get(page)
+                self.assertLessEqual(len(context.captured_queries), 1)
+                self.assertTemplateNotUsed(second, 'base.html')
+                self.assertEqual(first.content, second.content)
+                self.assertIn('Cookie', second['Vary'])
+
+    def test_cached_page_gets_user_header(self):
+        page = reverse('posts:index')
+        self.client.get(page)
+        response = self.authorized_client.get(page)
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertContains(response, 'Пользователь: test_user')
+        self.assertContains(response, 'Избранные авторы')
+        self.assertNotContains(response, '<!--esi:')
+
+    def test_cache_invalidated_by_signals(self):
+        page = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        self.client.get(page)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='new comment')
+        self.assertContains(self.client.get(page), 'new comment')
+        self.group.title = 'new title'
+        self.group.save()
+        self.assertContains(self.client.get(page), 'new title')
+
+    def test_personal_pages_not_shared(self):
+        page = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        self.client.get(page)
+        response = self.authorized_client.get(page)
+        self.assertTemplateUsed(response, 'base.html')
+        self.assertContains(response, 'редактировать запись')
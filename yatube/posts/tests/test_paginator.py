@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from django.conf import settings
+
+from ..models import Post, Comment
+from ..utils import CursorPage
+
+User = get_user_model()
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        Post.objects.bulk_create(
+            Post(text=f'test text post number {i}', author=cls.user_author)
+            for i in range(23)
+        )
+        cls.post_count_page = settings.POST_COUNT_DISPLAY
+
+    def setUp(self):
+        cache.clear()
+
+    def walk_pages(self, page):
+        cursor = ''
+        seen = []
+        while True:
+            response = self.client.get(page, {'cursor': cursor})
+            page_obj = response.context['page_obj']
+            self.assertIsInstance(page_obj, CursorPage)
+            seen.append([post.id for post in page_obj])
+            if not page_obj.has_next():
+                return seen, page_obj
+            cursor = page_obj.next_cursor
+
+    def test_cursor_pages_cover_feed(self):
+        pages = {
+            'index': reverse('posts:index'),
+            'profile': reverse(
+                'posts:profile',
+                kwargs={'username': self.user_author.username}),
+        }
+        expected = list(
+            Post.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True)
+        )
+        for name, page in pages.items():
+            with self.subTest(page=name):
+                seen, _ = self.walk_pages(page)
+                self.assertEqual(
+                    [len(ids) for ids in seen],
+                    [self.post_count_page, self.post_count_page, 3],
+                )
+                self.assertEqual(sum(seen, []), expected)
+
+    def test_cursor_previous_page(self):
+        page = reverse('posts:index')
+        seen, last_page = self.walk_pages(page)
+        response = self.client.get(
+            page, {'cursor': last_page.previous_cursor})
+        page_obj = response.context['page_obj']
+        self.assertEqual([post.id for post in page_obj], seen[-2])
+        self.assertTrue(page_obj.has_next())
+        self.assertTrue(page_obj.has_previous())
+
+    def test_cursor_bad_token_returns_first_page(self):
+        response = self.client.get(reverse('posts:index'), {'cursor': 'bad'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), self.post_count_page)
+        self.assertFalse(page_obj.has_previous())
+
+    @override_settings(POST_PAGINATION='cursor')
+    def test_cursor_mode_from_settings(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertIsInstance(response.context['page_obj'], CursorPage)
+        self.assertContains(response, '?cursor=')
+
+
+@override_settings(COMMENT_COUNT_DISPLAY=5)
+class CommentPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(text='test text', author=cls.user)
+        for i in range(12):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'comment {i}')
+
+    def test_comments_load_by_pages(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}))
+        comments = response.context['comments']
+        texts = [comment.text for comment in comments]
+        while comments.has_next():
+            response = self.client.get(
+                reverse('posts:post_comments',
+                        kwargs={'post_id': self.post.id}),
+                {'cursor': comments.next_cursor},
+            )
+            self.assertTemplateUsed(response, 'posts/includes/comments.html')
+            self.assertTemplateNotUsed(response, 'base.html')
+            comments = response.context['comments']
+            texts += [comment.text for comment in comments]
+        self.assertEqual(texts, [f'comment {i}' for i in range(12)])
+
+    def test_comments_fragment_queries(self):
+        page = reverse('posts:post_comments', kwargs={'post_id': self.post.id})
+        with self.assertNumQueries(2):
+            response = self.client.get(page)
+        self.assertContains(response, 'Показать ещё комментарии')
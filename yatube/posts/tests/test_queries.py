@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post, Group, Follow
+
+User = get_user_model()
+
+# index, group и profile тратят ещё один запрос на Last-Modified.
+QUERY_BUDGETS = {
+    'index': 3,
+    'group': 3,
+    'profile': 3,
+    'follow_index': 6,
+}
+
+
+class FeedQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            description='test_desc',
+            slug='test_slug'
+        )
+        for i in range(settings.POST_COUNT_DISPLAY + 1):
+            author = User.objects.create_user(
+                username=f'test_author_{i}',
+                first_name=f'first_{i}',
+                last_name=f'last_{i}',
+            )
+            Follow.objects.create(user=cls.user, author=author)
+            Post.objects.create(
+                text=f'test text post number {i}',
+                author=author,
+                group=cls.group,
+            )
+        cls.pages = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_posts_page',
+                             kwargs={'slug': cls.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': 'test_author_0'}),
+            'follow_index': reverse('posts:follow_index'),
+        }
+        newest = (
+            f'first_{settings.POST_COUNT_DISPLAY} '
+            f'last_{settings.POST_COUNT_DISPLAY}'
+        )
+        cls.expected_author = {
+            'index': newest,
+            'group': newest,
+            'profile': 'first_0 last_0',
+            'follow_index': newest,
+        }
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assertMaxQueries(self, budget, client, page):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(page)
+        queries = '\n'.join(
+            query['sql'] for query in context.captured_queries)
+        self.assertLessEqual(
+            len(context.captured_queries),
+            budget,
+            f'Страница {page} превысила бюджет запросов:\n{queries}'
+        )
+        return response
+
+    def test_feed_query_budgets(self):
+        for name, budget in QUERY_BUDGETS.items():
+            client = self.client
+            if name == 'follow_index':
+                client = self.authorized_client
+            with self.subTest(page=name):
+                response = self.assertMaxQueries(
+                    budget, client, self.pages[name])
+                self.assertContains(response, self.expected_author[name])
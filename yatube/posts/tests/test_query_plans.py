@@ -0,0 +1,101 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.jobs import work
+
+from ..models import Post, Group, Comment, Follow
+from ..utils import encode_cursor
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(?P<table>\w+)( AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+CHECKED_TABLES = (
+    'posts_post',
+    'posts_comment',
+    'posts_follow',
+    'posts_timelineentry',
+)
+
+
+class QueryPlanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        cls.group = Group.objects.create(
+            title='test_group',
+            description='test_desc',
+            slug='test_slug'
+        )
+        Follow.objects.create(user=cls.user, author=cls.user_author)
+        work(once=True)
+        for i in range(15):
+            post = Post.objects.create(
+                text=f'test text post number {i}',
+                author=cls.user_author,
+                group=cls.group,
+            )
+        for i in range(3):
+            Comment.objects.create(
+                post=post,
+                author=cls.user,
+                text=f'test comment {i}',
+            )
+        cls.post = post
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_plans(self, page):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.authorized_client.get(page)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or not any(
+                        table in sql for table in CHECKED_TABLES):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def test_feed_queries_use_indexes(self):
+        pages = {
+            'index': reverse('posts:index'),
+            'index_cursor': reverse('posts:index') + '?cursor=',
+            'group': reverse('posts:group_posts_page',
+                             kwargs={'slug': self.group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': self.user_author}),
+            'follow_index': reverse('posts:follow_index'),
+            'follow_index_cursor': reverse('posts:follow_index') + '?cursor=',
+            'follow_index_next': reverse('posts:follow_index')
+            + f'?cursor={encode_cursor(self.post)}',
+            'post_detail': reverse('posts:post_detail',
+                                   kwargs={'post_id': self.post.id}),
+        }
+        for name, page in pages.items():
+            for sql, plan in self.get_plans(page):
+                with self.subTest(page=name, sql=sql):
+                    for detail in plan:
+                        match = FULL_SCAN.match(detail)
+                        self.assertFalse(
+                            match and match['table'] in CHECKED_TABLES,
+                            f'Полный проход таблицы: {detail}\n{sql}'
+                        )
+                        self.assertNotIn(
+                            TEMP_SORT,
+                            detail,
+                            f'Сортировка без индекса: {detail}\n{sql}'
+                        )
@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+from django.urls import reverse
+
+from ..feed_cache import get_version
+from ..models import Post, Group
+from ..templatetags.feeds import feed_url_prefixes
+from ..utils import get_feed_queryset
+
+User = get_user_model()
+
+INCLUDE_LOOP = (
+    "{% for post in posts %}{% include 'posts/post_list.html' %}{% endfor %}"
+)
+RENDER_FEED = '{% load feeds %}{% render_feed posts %}'
+
+
+class RenderFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='test.author+1', first_name='Имя')
+        cls.group = Group.objects.create(
+            title='test_group',
+            description='test_desc',
+            slug='test-slug',
+        )
+        Post.objects.create(text='без группы', author=cls.author)
+        cls.post = Post.objects.create(
+            text='<b>с группой</b>', author=cls.author, group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, source, **context):
+        return Template(source).render(Context(context))
+
+    def test_same_html_as_include_loop(self):
+        posts = list(get_feed_queryset())
+        html = self.render(RENDER_FEED, posts=posts)
+        self.assertEqual(html, self.render(INCLUDE_LOOP, posts=posts))
+        self.assertIn('&lt;b&gt;с группой&lt;/b&gt;', html)
+        self.assertIn(
+            reverse('posts:profile', args=[self.author.username]), html)
+        self.assertIn(
+            reverse('posts:group_posts_page', args=[self.group.slug]), html)
+
+    def test_feed_url_matches_reverse(self):
+        prefixes = feed_url_prefixes()
+        source = "{% load feeds %}{% feed_url 'profile' name %}"
+        for username in ('user', 'u.s-e_r+1@x', 'юзер'):
+            with self.subTest(username=username):
+                expected = reverse('posts:profile', args=[username])
+                self.assertEqual(self.render(source, name=username), expected)
+                self.assertEqual(
+                    self.render(source, name=username, feed_urls=prefixes),
+                    expected,
+                )
+
+    def test_as_variable(self):
+        source = (
+            '{% load feeds %}{% render_feed posts as feed %}'
+            '{% for post_html in feed %}{{ post_html }}'
+            '{% empty %}пусто{% endfor %}'
+        )
+        self.assertEqual(self.render(source, posts=[]), 'пусто')
+        posts = list(get_feed_queryset())
+        self.assertEqual(
+            self.render(source, posts=posts),
+            self.render(RENDER_FEED, posts=posts),
+        )
+
+    def render_post(self):
+        posts = get_feed_queryset().filter(pk=self.post.pk)
+        return self.render(RENDER_FEED, posts=posts)
+
+    def test_cached_until_post_changes(self):
+        html = self.render_post()
+        Post.objects.filter(pk=self.post.pk).update(text='в обход')
+        self.assertEqual(self.render_post(), html)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'новый текст'
+        post.save()
+        self.assertIn('новый текст', self.render_post())
+
+    def test_group_and_author_changes_reset_cache(self):
+        self.render_post()
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new-slug'
+        group.save()
+        self.assertIn(
+            reverse('posts:group_posts_page', args=['new-slug']),
+            self.render_post(),
+        )
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = 'Новое'
+        author.save()
+        self.assertIn('Новое', self.render_post())
+
+    def test_group_delete_resets_cache(self):
+        url = reverse('posts:group_posts_page', args=[self.group.slug])
+        self.assertIn(url, self.render_post())
+        version = get_version('author', self.author.pk)
+        Group.objects.get(pk=self.group.pk).delete()
+        self.assertNotIn(url, self.render_post())
+        self.assertNotEqual(get_version('author', self.author.pk), version)
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, Comment
+from ..search import get_backend, InvertedIndex, Fts5Backend
+from ..stemmer import stem
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        cls.post_cats = Post.objects.create(
+            text='Мои кошки любят спать на подоконнике',
+            author=cls.user_author,
+        )
+        cls.post_dogs = Post.objects.create(
+            text='Собака гуляла во дворе',
+            author=cls.user_author,
+        )
+        cls.post_many_cats = Post.objects.create(
+            text='Кошка, кошке, кошкой: кошек много не бывает',
+            author=cls.user_author,
+        )
+        Comment.objects.create(
+            post=cls.post_dogs,
+            author=cls.user_author,
+            text='А у соседа живёт рыжая кошка',
+        )
+        for i in range(12):
+            Post.objects.create(
+                text=f'Пост номер {i} про котов',
+                author=cls.user_author,
+            )
+
+    def search(self, query, cursor=None):
+        params = {'q': query}
+        if cursor is not None:
+            params['cursor'] = cursor
+        response = self.client.get(reverse('posts:search'), params)
+        return response.context['page_obj']
+
+    def check_search(self):
+        page_obj = self.search('кошка')
+        found = [post.id for post in page_obj]
+        self.assertEqual(found[0], self.post_many_cats.id)
+        self.assertCountEqual(
+            found,
+            [self.post_cats.id, self.post_dogs.id, self.post_many_cats.id],
+        )
+        self.assertEqual(len(self.search('кошки собака')), 0)
+
+        first = self.search('котов')
+        self.assertTrue(first.has_next())
+        second = self.search('котов', first.next_cursor)
+        self.assertEqual(len(first) + len(second), 12)
+        self.assertFalse(set(first) & set(second))
+
+        Post.objects.get(pk=self.post_dogs.pk).delete()
+        found = [post.id for post in self.search('кошка')]
+        self.assertNotIn(self.post_dogs.id, found)
+
+    def test_stemmer(self):
+        words = ['кошка', 'кошки', 'кошкой', 'кошке']
+        self.assertEqual(len({stem(word) for word in words}), 1)
+
+    def test_fts5_search(self):
+        self.assertIsInstance(get_backend(), Fts5Backend)
+        self.check_search()
+
+    @override_settings(SEARCH_BACKEND='memory')
+    def test_memory_search(self):
+        backend = get_backend()
+        self.assertIsInstance(backend, InvertedIndex)
+        backend.rebuild()
+        self.check_search()
@@ -0,0 +1,40 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from users.models import Profile
+
+from ..counters import get_index_count
+from ..models import Post, Group, Comment, Follow, TimelineEntry
+
+User = get_user_model()
+
+
+class SeedBenchmarkDataTest(TestCase):
+    def test_seed_creates_consistent_dataset(self):
+        call_command(
+            'seed_benchmark_data',
+            '--users', '30',
+            '--groups', '3',
+            '--posts', '200',
+            '--comments', '100',
+            '--images', '0',
+            stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertEqual(get_index_count(), 200)
+        self.assertTrue(Follow.objects.exists())
+        self.assertEqual(
+            sum(Profile.objects.values_list('posts_count', flat=True)), 200)
+        follow = Follow.objects.first()
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=follow.user_id).filter(
+                post__author=follow.author_id).count(),
+            Post.objects.filter(author=follow.author_id).count(),
+        )
+        self.assertGreater(
+            Post.objects.dates('pub_date', 'day').count(), 1)
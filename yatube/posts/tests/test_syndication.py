@@ -0,0 +1,90 @@
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Post, Group
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class SyndicationFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='test_group',
+            description='test_desc',
+            slug='test_slug',
+        )
+        cls.post = Post.objects.create(
+            text='test <b>text</b>',
+            author=cls.author,
+            group=cls.group,
+        )
+        cls.feeds = {
+            'index': ('posts:index_feed', []),
+            'group': ('posts:group_feed', [cls.group.slug]),
+            'profile': ('posts:profile_feed', [cls.author.username]),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def read(self, response):
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def test_feeds_list_posts(self):
+        for name, (url_name, args) in self.feeds.items():
+            with self.subTest(feed=name):
+                response = self.client.get(
+                    reverse(url_name, args=args + ['rss']))
+                self.assertTrue(response.streaming)
+                root = ElementTree.fromstring(self.read(response))
+                items = root.findall('channel/item')
+                self.assertEqual(len(items), 1)
+                self.assertEqual(
+                    items[0].find('description').text,
+                    '<p>test &lt;b&gt;text&lt;/b&gt;</p>',
+                )
+                response = self.client.get(
+                    reverse(url_name, args=args + ['atom']))
+                root = ElementTree.fromstring(self.read(response))
+                self.assertEqual(len(root.findall(f'{ATOM}entry')), 1)
+
+    def test_cached_until_feed_changes(self):
+        url = reverse('posts:group_feed', args=[self.group.slug, 'rss'])
+        content = self.read(self.client.get(url))
+        response = self.client.get(url)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content, content)
+        Post.objects.create(
+            text='new text', author=self.author, group=self.group)
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertIn(b'new text', self.read(response))
+
+    def test_not_modified(self):
+        url = reverse(
+            'posts:profile_feed', args=[self.author.username, 'atom'])
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_feed(self):
+        urls = (
+            reverse('posts:index_feed', args=['json']),
+            reverse('posts:group_feed', args=['missing', 'rss']),
+            reverse('posts:profile_feed', args=['missing', 'rss']),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
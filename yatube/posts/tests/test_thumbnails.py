@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Job
+
+from ..models import Post
+from ..thumbnails import DeferredThumbnailBackend
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class DeferredThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.post = Post.objects.create(
+            text='test text post',
+            author=cls.user_author,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=small_gif,
+                content_type='image/gif'
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_placeholder_until_thumbnail_is_ready(self):
+        page = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        response = self.client.get(page)
+        self.assertContains(response, 'aspect-ratio: 960 / 339')
+        self.assertNotContains(response, 'Картинка поста')
+
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'posts.thumbnails.generate_thumbnail')
+        self.assertIn(self.post.image.name, job.args)
+
+        call_command('run_workers', '--once', '--processes', '1',
+                     stdout=StringIO())
+        self.assertFalse(Job.objects.exists())
+        response = self.client.get(page)
+        self.assertContains(response, 'Картинка поста')
+        self.assertNotContains(response, 'aspect-ratio: 960 / 339')
+
+    def test_scheduled_once(self):
+        backend = DeferredThumbnailBackend()
+        self.assertIsNone(backend.get_thumbnail(self.post.image, '960x339'))
+        Job.objects.all().delete()
+        self.assertIsNone(backend.get_thumbnail(self.post.image, '960x339'))
+        self.assertFalse(Job.objects.exists())
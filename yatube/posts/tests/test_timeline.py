@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.jobs import work
+from core.models import Job
+
+from ..models import Post, Follow, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.user_author = User.objects.create_user(username='test_user_author')
+        cls.old_post = Post.objects.create(
+            text='test old post',
+            author=cls.user_author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def get_feed(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return [post.id for post in response.context['page_obj']]
+
+    def test_follow_fills_and_unfollow_clears_timeline(self):
+        self.authorized_client.get(
+            reverse('posts:profile_follow',
+                    kwargs={'username': self.user_author.username}))
+        # Пока задача не выполнена, старые посты читаются напрямую.
+        self.assertEqual(self.get_feed(), [self.old_post.id])
+        work(once=True)
+        new_post = Post.objects.create(
+            text='test new post',
+            author=self.user_author,
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(self.get_feed(), [new_post.id, self.old_post.id])
+
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow',
+                    kwargs={'username': self.user_author.username}))
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user).exists())
+        self.assertEqual(self.get_feed(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_high_follower_author_is_pulled(self):
+        Follow.objects.create(user=self.user, author=self.user_author)
+        cache.clear()
+        new_post = Post.objects.create(
+            text='test new post',
+            author=self.user_author,
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=new_post).exists())
+        self.assertEqual(self.get_feed(), [new_post.id, self.old_post.id])
+
+    def test_backfill_command(self):
+        Follow.objects.create(user=self.user, author=self.user_author)
+        TimelineEntry.objects.all().delete()
+        call_command('backfill_timelines', stdout=StringIO())
+        self.assertEqual(self.get_feed(), [self.old_post.id])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_leaving_pull_is_backfilled(self):
+        Follow.objects.create(user=self.user, author=self.user_author)
+        work(once=True)
+        other = User.objects.create_user(username='test_other')
+        # Вторая подписка делает автора тянущим.
+        follow = Follow.objects.create(user=other, author=self.user_author)
+        new_post = Post.objects.create(
+            text='test new post',
+            author=self.user_author,
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=new_post).exists())
+        follow.delete()
+        # До задачи посты автора читаются напрямую.
+        self.assertEqual(self.get_feed(), [new_post.id, self.old_post.id])
+        Job.objects.update(run_after=timezone.now())
+        work(once=True)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.user, post=new_post).exists())
+        self.assertTrue(Follow.objects.get(user=self.user).backfilled)
+        self.assertEqual(self.get_feed(), [new_post.id, self.old_post.id])
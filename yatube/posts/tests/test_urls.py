@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 from http import HTTPStatus
 
@@ -44,6 +45,7 @@ class StaticURLTest(TestCase):
         }
 
     def setUp(self) -> None:
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
         self.author_client = Client()
@@ -332,8 +332,9 @@ class PostViewsTest(TestCase):
     def test_cache_index_page(self):
         page = self.reverse_list['index']
         response = self.client.get(page)
-        response.context['page_obj'][0].delete()
+        first_obj = response.context['page_obj'][0]
         first_content = response.content
+        Post.objects.filter(pk=first_obj.pk).update(text='changed text')
 
         response = self.client.get(page)
         cache_content = response.content
@@ -350,6 +351,35 @@ class PostViewsTest(TestCase):
             'После очистки кеша страница не изменилась'
         )
 
+    def test_cache_invalidated_on_post_changes(self):
+        pages = [
+            self.reverse_list['index'],
+            self.reverse_list['group_one'],
+            self.reverse_list['profile'],
+        ]
+        for page in pages:
+            with self.subTest(page=page):
+                first_content = self.client.get(page).content
+                post = Post.objects.create(
+                    text=f'fresh post for {page}',
+                    author=self.user_author,
+                    group=self.group_one,
+                )
+                response = self.client.get(page)
+                self.assertNotEqual(response.content, first_content)
+                self.assertContains(response, post.text)
+                post.delete()
+                response = self.client.get(page)
+                self.assertNotContains(response, post.text)
+
+    def test_cache_profile_varies_by_author(self):
+        first = self.client.get(self.reverse_list['profile'])
+        second = self.client.get(
+            reverse('posts:profile',
+                    kwargs={'username': self.user_author_two.username}))
+        self.assertContains(first, self.user_author.username)
+        self.assertNotContains(second, f'/profile/{self.user_author}/')
+
     def test_follow_authorized(self):
         page_follow = self.reverse_list['post_follow']
         self.authorized_client.get(page_follow)
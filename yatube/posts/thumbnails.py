@@ -0,0 +1,99 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.helpers import tokey, serialize, deserialize
+from sorl.thumbnail.images import ImageFile
+
+from core import jobs
+from core.performance import timed
+
+# Размеры, которые выводят post_list.html и post_detail.html
+POST_THUMBNAILS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
+SCHEDULED_KEY = 'thumbnail:scheduled:{}'
+
+_render_state = threading.local()
+
+
+def get_missed_count():
+    """Сколько миниатюр в этом потоке уже заменено заглушкой."""
+    return getattr(_render_state, 'missed', 0)
+
+
+def mark_missed():
+    _render_state.missed = get_missed_count() + 1
+
+
+def schedule(name, geometry, options):
+    options = serialize(options)
+    # Пока миниатюры нет, каждый показ страницы просит её снова: в очередь
+    # идёт одна задача за THUMBNAIL_SCHEDULE_TIMEOUT, остальные отсекает кеш.
+    if not cache.add(
+        SCHEDULED_KEY.format(tokey(name, geometry, options)),
+        True,
+        settings.THUMBNAIL_SCHEDULE_TIMEOUT,
+    ):
+        return
+    jobs.enqueue(
+        generate_thumbnail, name, geometry, options,
+        priority=jobs.PRIORITY_LOW,
+    )
+
+
+def generate_thumbnail(name, geometry, options):
+    """Фоновая задача: создаёт миниатюру и кладёт её в хранилище sorl."""
+    default.backend.generate(name, geometry, **deserialize(options))
+
+
+def schedule_post_thumbnails(post):
+    if not post.image:
+        return
+    for geometry, options in POST_THUMBNAILS:
+        schedule(post.image.name, geometry, dict(options))
+
+
+class DeferredThumbnailBackend(ThumbnailBackend):
+    """
+    Отдаёт только уже готовые миниатюры, а недостающие ставит в очередь
+    фоновых задач run_workers; шаблон в это время показывает заглушку.
+    """
+
+    def _prepare_options(self, source, options):
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        return options
+
+    def get_cached_thumbnail(self, file_, geometry_string, **options):
+        source = ImageFile(file_)
+        options = self._prepare_options(source, options)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+    @timed('thumbnail')
+    def get_thumbnail(self, file_, geometry_string, **options):
+        if not settings.THUMBNAIL_DEFERRED or settings.JOBS_EAGER:
+            return self.generate(file_, geometry_string, **options)
+        if not file_:
+            raise ValueError('falsey file_ argument in get_thumbnail()')
+        cached = self.get_cached_thumbnail(file_, geometry_string, **options)
+        if cached:
+            return cached
+        schedule(ImageFile(file_).name, geometry_string, options)
+        mark_missed()
+        return None
+
+    def generate(self, file_, geometry_string, **options):
+        return super().get_thumbnail(file_, geometry_string, **options)
@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+
+from core import jobs
+
+from .bulk import chunked
+from .models import Post, Follow, TimelineEntry
+
+PULL_AUTHORS_CACHE_KEY = 'timeline:pull_authors'
+# Лента сортируется по записям ленты: так хватает индекса (user, pub_date,
+# post), а курсор не отличается от курсора по (pub_date, id) поста.
+TIMELINE_ORDERING = ('-entry_pub_date', '-entry_post')
+
+
+def get_pull_authors():
+    """Авторы, чьи посты не раскладываются по лентам, а читаются при показе."""
+    authors = cache.get(PULL_AUTHORS_CACHE_KEY)
+    if authors is None:
+        authors = set(
+            Follow.objects.values('author').annotate(
+                followers=Count('id')
+            ).filter(
+                followers__gt=settings.TIMELINE_FANOUT_LIMIT
+            ).values_list('author', flat=True)
+        )
+        cache.set(
+            PULL_AUTHORS_CACHE_KEY,
+            authors,
+            settings.TIMELINE_PULL_AUTHORS_TIMEOUT,
+        )
+    return authors
+
+
+def fan_out_post(post):
+    fan_out_posts([post])
+
+
+def _fan_out(condition, params):
+    ops = connection.ops
+    # INSERT ... SELECT не создаёт объект на каждую запись ленты.
+    sql = (
+        f'{ops.insert_statement(ignore_conflicts=True)} '
+        f'{TimelineEntry._meta.db_table} (user_id, post_id, pub_date) '
+        f'SELECT f.user_id, p.id, p.pub_date '
+        f'FROM {Follow._meta.db_table} f '
+        f'JOIN {Post._meta.db_table} p ON p.author_id = f.author_id '
+        f'WHERE {condition} '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def fan_out_posts(posts):
+    """Раскладывает пачку постов по лентам подписчиков на стороне базы."""
+    pull_authors = get_pull_authors()
+    post_ids = [
+        post.pk for post in posts if post.author_id not in pull_authors]
+    for chunk in chunked(post_ids, settings.TIMELINE_BATCH_SIZE):
+        _fan_out(f'p.id IN ({", ".join(["%s"] * len(chunk))})', chunk)
+
+
+def _is_pull_author(author_id):
+    # Точный ответ для задач и подписок: кеш get_pull_authors() отстаёт.
+    followers = Follow.objects.filter(author_id=author_id).count()
+    return followers > settings.TIMELINE_FANOUT_LIMIT
+
+
+def follow_added(follow):
+    if not _is_pull_author(follow.author_id):
+        jobs.enqueue(backfill_follow, follow.pk)
+        return
+    # Автор стал тянущим: его новые посты больше не раскладываются. Ленты
+    # подписчиков помечаются неполными и читают его посты напрямую, даже
+    # в процессах, где список тянущих авторов ещё не обновился.
+    cache.delete(PULL_AUTHORS_CACHE_KEY)
+    Follow.objects.filter(
+        author_id=follow.author_id, backfilled=True,
+    ).update(backfilled=False)
+
+
+def follow_removed(follow):
+    remove_author(follow.user_id, follow.author_id)
+    followers = Follow.objects.filter(author_id=follow.author_id).count()
+    if followers == settings.TIMELINE_FANOUT_LIMIT:
+        cache.delete(PULL_AUTHORS_CACHE_KEY)
+        # Другие процессы раскладывают посты по старому списку тянущих
+        # авторов, пока он не истечёт в их кеше.
+        jobs.enqueue(
+            backfill_author,
+            follow.author_id,
+            delay=settings.TIMELINE_PULL_AUTHORS_TIMEOUT,
+        )
+
+
+def add_author(user_id, author_id):
+    if author_id in get_pull_authors():
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date')
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ),
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id,
+        post__author_id=author_id,
+    ).delete()
+
+
+def backfill_follow(follow_id):
+    """Фоновая задача: раскладывает посты автора в ленту подписчика."""
+    author_id = Follow.objects.filter(pk=follow_id).values_list(
+        'author', flat=True).first()
+    if author_id is None or _is_pull_author(author_id):
+        # Лента остаётся неполной, посты тянущего автора читаются напрямую.
+        return
+    with transaction.atomic():
+        # Флаг ставится первым: отписка, пришедшая позже, уберёт записи.
+        if not Follow.objects.filter(
+            pk=follow_id, backfilled=False
+        ).update(backfilled=True):
+            return
+        _fan_out('f.id = %s', [follow_id])
+
+
+def backfill_author(author_id):
+    """
+    Фоновая задача: автор перестал быть тянущим. Посты, которые вышли,
+    пока он им был, раскладываются по лентам всех его подписчиков.
+    """
+    if _is_pull_author(author_id):
+        return
+    with transaction.atomic():
+        Follow.objects.filter(author_id=author_id).update(backfilled=True)
+        _fan_out('p.author_id = %s', [author_id])
+
+
+def rebuild_timeline(user_id):
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    follows = Follow.objects.filter(user_id=user_id)
+    for author_id in follows.values_list('author', flat=True):
+        add_author(user_id, author_id)
+    follows.exclude(author__in=get_pull_authors()).update(backfilled=True)
+
+
+def get_timeline(user):
+    posts_list = Post.objects.all()
+    followed = dict(
+        user.follower.values_list('author', 'backfilled')
+    )
+    pending = {author for author, backfilled in followed.items()
+               if not backfilled}
+    pull_authors = (followed.keys() & get_pull_authors()) | pending
+    if not pull_authors:
+        return posts_list.filter(timeline_entries__user=user).annotate(
+            entry_pub_date=F('timeline_entries__pub_date'),
+            entry_post=F('timeline_entries__post'),
+        ).order_by(*TIMELINE_ORDERING)
+    return posts_list.filter(
+        Q(id__in=TimelineEntry.objects.filter(user=user).values('post'))
+        | Q(author__in=pull_authors)
+    )
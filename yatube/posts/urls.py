@@ -1,12 +1,16 @@
 from django.urls import path
 
-from . import views
+from . import api, syndication, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_posts_page'),
+    path(
+        'group/<slug:slug>/feed/<str:kind>/',
+        syndication.group_feed,
+        name='group_feed'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -17,13 +21,41 @@ urlpatterns = [
         name='profile_unfollow',
     ),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/feed/<str:kind>/',
+        syndication.profile_feed,
+        name='profile_feed'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
+    path('feed/<str:kind>/', syndication.index_feed, name='index_feed'),
+    path('api/v1/posts/', api.index, name='api_index'),
+    path(
+        'api/v1/groups/<slug:slug>/posts/',
+        api.group_posts,
+        name='api_group_posts'),
+    path(
+        'api/v1/profiles/<str:username>/posts/',
+        api.profile,
+        name='api_profile'),
+    path('api/v1/follow/', api.follow_index, name='api_follow_index'),
+    path(
+        'api/v1/posts/<int:post_id>/',
+        api.post_detail,
+        name='api_post_detail'),
+    path(
+        'api/v1/posts/<int:post_id>/comments/',
+        api.post_comments,
+        name='api_post_comments'),
 
 ]
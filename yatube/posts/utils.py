@@ -1,8 +1,204 @@
-from django.core.paginator import Paginator
+from collections.abc import Sequence
+
 from django.conf import settings
+from django.core import signing
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Post, Comment
+
+CURSOR_SALT = 'posts.cursor'
+CURSOR_ORDERING = ('-pub_date', '-id')
+COMMENT_CURSOR_SALT = 'posts.comments.cursor'
+COMMENT_ORDERING = ('created', 'id')
+COMMENT_FIELDS = (
+    'id',
+    'text',
+    'created',
+    'post',
+    'author',
+    'author__username',
+)
+
+FEED_FIELDS = (
+    'id',
+    'text',
+    'pub_date',
+    'image',
+    'image_width',
+    'image_height',
+    'updated',
+    'author',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group',
+    'group__slug',
+)
+
+
+def get_feed_queryset(posts_list=None):
+    """Посты ленты только с теми полями, которые выводит post_list.html."""
+    if posts_list is None:
+        posts_list = Post.objects.all()
+    return posts_list.select_related('author', 'group').only(*FEED_FIELDS)
+
+
+class CountedPaginator(Paginator):
+    """Paginator, который берёт количество объектов из готового счётчика."""
 
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.__dict__['count'] = count
 
-def get_page_obj(posts_list, page_number):
-    paginator = Paginator(posts_list, settings.POST_COUNT_DISPLAY)
+
+def get_page_obj(posts_list, page_number, cursor=None, count=None):
+    if cursor is not None or settings.POST_PAGINATION == 'cursor':
+        return get_cursor_page(posts_list, cursor)
+    paginator = CountedPaginator(
+        posts_list,
+        settings.POST_COUNT_DISPLAY,
+        count=count,
+    )
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def encode_cursor(post, previous=False):
+    return signing.dumps(
+        (post.pub_date.isoformat(), post.id, previous),
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def decode_cursor(cursor):
+    try:
+        pub_date, post_id, previous = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    pub_date = parse_datetime(pub_date)
+    if pub_date is None or not isinstance(post_id, int):
+        return None
+    return pub_date, post_id, bool(previous)
+
+
+def get_cursor_page(posts_list, cursor):
+    per_page = settings.POST_COUNT_DISPLAY
+    # Заданный запросом порядок (как у ленты подписок) становится ключом.
+    ordering = tuple(posts_list.query.order_by) or CURSOR_ORDERING
+    date_field, id_field = (field.lstrip('-') for field in ordering)
+    position = decode_cursor(cursor) if cursor else None
+    if position is None:
+        rows = list(posts_list.order_by(*ordering)[:per_page + 1])
+        return CursorPage(rows[:per_page], len(rows) > per_page, False, cursor)
+
+    pub_date, post_id, previous = position
+    if previous:
+        rows = list(
+            posts_list.filter(
+                Q(**{f'{date_field}__gt': pub_date})
+                | Q(**{date_field: pub_date, f'{id_field}__gt': post_id})
+            ).order_by(date_field, id_field)[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return CursorPage(rows, True, has_previous, cursor)
+
+    rows = list(
+        posts_list.filter(
+            Q(**{f'{date_field}__lt': pub_date})
+            | Q(**{date_field: pub_date, f'{id_field}__lt': post_id})
+        ).order_by(*ordering)[:per_page + 1]
+    )
+    return CursorPage(rows[:per_page], len(rows) > per_page, True, cursor)
+
+
+class CursorPage(Sequence):
+    """Страница keyset-пагинации по (pub_date, id) без COUNT и OFFSET."""
+
+    is_cursor = True
+    number = None
+
+    def __init__(self, object_list, has_next, has_previous, cursor=None):
+        self.object_list = object_list
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+        self.cursor = cursor or ''
+
+    def __repr__(self):
+        return f'<CursorPage {self.cursor or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor(self.object_list[0], previous=True)
+
+
+class CommentPage(CursorPage):
+    """Порция комментариев по (created, id) для «Показать ещё»."""
+
+    def __init__(self, object_list, has_next, cursor=None):
+        super().__init__(object_list, has_next, bool(cursor), cursor)
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        comment = self.object_list[-1]
+        return signing.dumps(
+            (comment.created.isoformat(), comment.id),
+            salt=COMMENT_CURSOR_SALT,
+        )
+
+    @property
+    def previous_cursor(self):
+        return None
+
+
+def decode_comment_cursor(cursor):
+    try:
+        created, comment_id = signing.loads(cursor, salt=COMMENT_CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    created = parse_datetime(created)
+    if created is None or not isinstance(comment_id, int):
+        return None
+    return created, comment_id
+
+
+def get_comments_page(post, cursor=None):
+    per_page = settings.COMMENT_COUNT_DISPLAY
+    comments = Comment.objects.filter(post=post).select_related(
+        'author').only(*COMMENT_FIELDS).order_by(*COMMENT_ORDERING)
+    position = decode_comment_cursor(cursor) if cursor else None
+    if position is not None:
+        created, comment_id = position
+        comments = comments.filter(
+            Q(created__gt=created) | Q(created=created, id__gt=comment_id))
+    rows = list(comments[:per_page + 1])
+    return CommentPage(rows[:per_page], len(rows) > per_page, cursor)
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+
+def validate_image_size(file):
+    """
+    Проверяет размер новой загрузки. Он берётся у загрузки, а не у
+    сохранённых байт: лишние ImageUploadHandler не сохраняет.
+    """
+    # Уже сохранённый файл не перечитывается из хранилища.
+    if getattr(file, '_committed', False):
+        return
+    if file.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Файл больше %(limit)d МБ',
+            params={'limit': settings.IMAGE_MAX_UPLOAD_SIZE // 2 ** 20},
+        )
@@ -1,18 +1,33 @@
+from functools import partial
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 
+from core.concurrent import gather
+
+from .conditional import index_page, group_page, profile_page, post_page
 from .forms import PostForm, CommentForm
-from .models import Post, Group, Comment, Follow
-from .utils import get_page_obj
+from .images import limit_image_upload
+from .models import Post, Group, Follow
+from .counters import get_index_count, get_author_count, get_follow_count
+from .search import search_posts
+from .timeline import get_timeline
+from .utils import get_page_obj, get_feed_queryset, get_comments_page
 
 
+@index_page
 def index(request):
     template = 'posts/index.html'
     title = 'Главная страница'
 
-    posts_list = Post.objects.select_related('group').all()
-    page_obj = get_page_obj(posts_list, request.GET.get('page'))
+    posts_list = get_feed_queryset()
+    page_obj = get_page_obj(
+        posts_list,
+        request.GET.get('page'),
+        request.GET.get('cursor'),
+        get_index_count(),
+    )
     context = {
         'title': title,
         'page_obj': page_obj,
@@ -20,10 +35,16 @@ def index(request):
     return render(request, template, context)
 
 
+@group_page
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts_list = group.posts.all()
-    page_obj = get_page_obj(posts_list, request.GET.get('page'))
+    posts_list = get_feed_queryset(group.posts.all())
+    page_obj = get_page_obj(
+        posts_list,
+        request.GET.get('page'),
+        request.GET.get('cursor'),
+        group.posts_count,
+    )
     template = 'posts/group_list.html'
     context = {
         'page_obj': page_obj,
@@ -32,41 +53,84 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@profile_page
 def profile(request, username):
     template = 'posts/profile.html'
     title = f'Профиль пользователя {username}'
-    author = get_object_or_404(User, username=username)
-    posts_list = author.posts.all()
-    page_obj = get_page_obj(posts_list, request.GET.get('page'))
+    get_author = partial(
+        get_object_or_404,
+        User.objects.select_related('profile'),
+        username=username,
+    )
     if not request.user.is_authenticated:
-        follow = False
+        author, follow = get_author(), False
     else:
-        follow = request.user.follower.filter(author=author).exists()
+        # Посты страницы не выбираются заранее: их отдаёт кеш фрагмента.
+        author, follow = gather(
+            get_author,
+            request.user.follower.filter(author__username=username).exists,
+        )
+    posts_count = get_author_count(author)
+    posts_list = get_feed_queryset(author.posts.all())
+    page_obj = get_page_obj(
+        posts_list,
+        request.GET.get('page'),
+        request.GET.get('cursor'),
+        posts_count,
+    )
     context = {
         'title': title,
         'author': author,
+        'posts_count': posts_count,
         'page_obj': page_obj,
         'follow': follow,
     }
     return render(request, template, context)
 
 
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    page_obj = search_posts(query, request.GET.get('cursor'))
+    context = {
+        'title': f'Поиск: {query}' if query else 'Поиск',
+        'q': query,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@post_page
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post, comments = gather(
+        lambda: get_object_or_404(
+            Post.objects.select_related('author__profile', 'group'),
+            pk=post_id,
+        ),
+        lambda: get_comments_page(post_id, request.GET.get('cursor')),
+    )
     title = post.text[:30]
     form = CommentForm()
-    comments = Comment.objects.filter(post=post)
     context = {
         'title': title,
         'post': post,
+        'posts_count': get_author_count(post.author),
         'form': form,
         'comments': comments
     }
     return render(request, template, context)
 
 
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    comments = get_comments_page(post, request.GET.get('cursor'))
+    template = 'posts/includes/comments.html'
+    return render(request, template, {'post': post, 'comments': comments})
+
+
 @login_required()
+@limit_image_upload
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -80,6 +144,7 @@ def post_create(request):
 
 
 @login_required()
+@limit_image_upload
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = PostForm(
@@ -114,10 +179,17 @@ def add_comment(request, post_id):
 def follow_index(request):
     title = 'Ваши подписки'
     template = 'posts/follow.html'
-    follow_list = request.user.follower.all().values('author')
-    posts_list = Post.objects.select_related('group').filter(
-        author__in=follow_list)
-    page_obj = get_page_obj(posts_list, request.GET.get('page'))
+    # Список подписок для ленты и счётчик постов читаются одновременно.
+    timeline, posts_count = gather(
+        partial(get_timeline, request.user),
+        partial(get_follow_count, request.user),
+    )
+    page_obj = get_page_obj(
+        get_feed_queryset(timeline),
+        request.GET.get('page'),
+        request.GET.get('cursor'),
+        posts_count,
+    )
     context = {
         'title': title,
         'page_obj': page_obj,
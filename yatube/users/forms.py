@@ -1,11 +1,68 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
 from django import forms
+from django.core.mail import EmailMultiAlternatives
+from django.template import loader
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from core import jobs
 from .models import Contact
 
 User = get_user_model()
 
 
+# Эти значения контекста письма не попадают в очередь: по ним можно
+# сбросить пароль, поэтому их создаёт сама задача.
+SECRET_CONTEXT = ('user', 'uid', 'token')
+
+
+def send_password_reset(user_id, context, subject_template_name,
+                        email_template_name, from_email, to_email,
+                        html_email_template_name=None):
+    """Фоновая задача: письмо со ссылкой сброса пароля."""
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    context = {
+        **context,
+        'user': user,
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': default_token_generator.make_token(user),
+    }
+    subject = loader.render_to_string(subject_template_name, context)
+    subject = ''.join(subject.splitlines())
+    body = loader.render_to_string(email_template_name, context)
+    message = EmailMultiAlternatives(subject, body, from_email, [to_email])
+    if html_email_template_name is not None:
+        html_body = loader.render_to_string(
+            html_email_template_name, context)
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """
+    Письмо отправляет воркер. В очередь попадают только id пользователя и
+    имена шаблонов: ссылку со сбросом пароля задача строит сама.
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        public_context = {
+            key: value for key, value in context.items()
+            if key not in SECRET_CONTEXT
+        }
+        jobs.enqueue(
+            send_password_reset, context['user'].pk, public_context,
+            subject_template_name, email_template_name, from_email, to_email,
+            html_email_template_name,
+            priority=jobs.PRIORITY_HIGH,
+        )
+
+
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
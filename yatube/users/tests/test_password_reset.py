@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.jobs import work
+from core.models import Job
+
+User = get_user_model()
+
+
+@override_settings(JOBS_EAGER=False)
+class PasswordResetTest(TestCase):
+    def test_email_is_sent_by_worker(self):
+        User.objects.create_user(
+            username='test_user', email='test@test.ru', password='pass12345')
+        response = self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'test@test.ru'},
+        )
+        self.assertRedirects(response, reverse('users:password_reset_done'))
+        self.assertEqual(len(mail.outbox), 0)
+        job = Job.objects.get()
+        # В очереди нет ни ссылки, ни токена сброса пароля.
+        self.assertNotIn('/reset/', job.args)
+        self.assertNotIn('token', job.args)
+        work(once=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@test.ru'])
+        self.assertIn('/reset/', mail.outbox[0].body)
+        link = mail.outbox[0].body.split('/reset/', 1)[1].split()[0]
+        uid, token = link.strip('/').split('/')
+        user = User.objects.get(username='test_user')
+        self.assertTrue(default_token_generator.check_token(user, token))
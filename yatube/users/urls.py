@@ -10,6 +10,7 @@ from django.contrib.auth.views import \
     PasswordResetConfirmView
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -41,7 +42,8 @@ urlpatterns = [
     path(
         'password_reset/',
         PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'
+            template_name='users/password_reset_form.html',
+            form_class=QueuedPasswordResetForm,
         ),
         name='password_reset_form'
     ),
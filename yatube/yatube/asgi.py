@@ -0,0 +1,30 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Django 2.2 has no ASGI support of its own, so core.asgi.ASGIHandler adapts
+the regular request handler; on Django 3.0+ the built-in one is used.
+"""
+
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+if django.VERSION >= (3, 0):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+else:
+    django.setup(set_prefix=False)
+
+    from core.asgi import ASGIHandler
+
+    application = ASGIHandler()
+
+# Как и в wsgi.py: первый запрос к воркеру не ждёт разбора шаблонов.
+from core.template_cache import is_cached, warm  # noqa: E402
+
+if is_cached():
+    warm()
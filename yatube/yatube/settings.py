@@ -18,6 +18,18 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Number of posts display entries
 POST_COUNT_DISPLAY = 10
 
+# Number of comments shown on post_detail and per "load more" request
+COMMENT_COUNT_DISPLAY = 20
+
+# Pagination mode for feeds: 'page' (?page=N) or 'cursor' (?cursor=<token>)
+POST_PAGINATION = 'page'
+
+# Follow timeline: authors with more followers than the limit are not
+# fanned out on write, their posts are pulled into the feed on read
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_PULL_AUTHORS_TIMEOUT = 60
+TIMELINE_BATCH_SIZE = 500
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
 
@@ -52,9 +64,12 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
     'sorl.thumbnail',
+    'rest_framework',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,12 +85,24 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+# Parsed templates are kept in memory by the cached loader and parsed in
+# advance when a WSGI worker starts; off with DEBUG so edits show up at once
+TEMPLATE_CACHE = not DEBUG
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that adds render time to PERFORMANCE_METRICS
+        'BACKEND': 'core.performance.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': (
+                [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE else TEMPLATE_LOADERS
+            ),
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -88,11 +115,90 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
+# yatube.asgi.application: on Django 2.2 the ASGI adapter reads requests and
+# writes responses on the event loop and runs Django itself in this many
+# threads
+ASGI_THREADS = 8
+
+# Full-text search: 'auto' uses SQLite FTS5 when available and falls back
+# to an in-process inverted index, 'memory' forces the fallback
+SEARCH_BACKEND = 'auto'
+
+# Thumbnails are generated by run_workers jobs, templates render a placeholder
+# until the thumbnail is ready
+THUMBNAIL_BACKEND = 'posts.thumbnails.DeferredThumbnailBackend'
+THUMBNAIL_DEFERRED = True
+THUMBNAIL_PENDING_CACHE_TIMEOUT = 10
+# A missing thumbnail is queued at most once per this many seconds
+THUMBNAIL_SCHEDULE_TIMEOUT = 300
+
+# Post images over the limit are rejected by their full size; uploads to the
+# post form stop saving bytes past the limit early
+IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+# Uploaded originals are downscaled to this longest side
+IMAGE_MAX_SIDE = 2560
+
+# Background jobs: views enqueue work into core.Job and run_workers executes
+# it. JOBS_EAGER runs every job inline at enqueue time instead. A claimed job
+# becomes visible to other workers again after the visibility timeout; failed
+# jobs are retried after JOBS_RETRY_DELAY * 2 ** (attempt - 1) seconds
+JOBS_EAGER = False
+JOBS_WORKERS = 2
+JOBS_VISIBILITY_TIMEOUT = 5 * 60
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10
+
+# Feed fragments and RSS/Atom documents live until the feed generation changes
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Number of latest posts in RSS/Atom feeds
+FEED_ITEMS = 50
+
+# Whole pages are cached for anonymous visitors until their feed generation
+# changes; per-user fragments listed here are stitched in on every request
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 60 * 60
+ESI_FRAGMENTS = (
+    'includes/header.html',
+    'posts/includes/switcher.html',
+)
+
+# Independent queries of one view (page posts, follow status, comments) run
+# in this many threads, each with its own connection; 0 runs them in turn
+CONCURRENT_QUERIES = 4
+
+# Per-request timings in the Server-Timing header (staff and DEBUG only)
+# and an in-process histogram at /admin/performance/; bucket bounds are in
+# milliseconds
+PERFORMANCE_METRICS = True
+PERFORMANCE_BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# The JSON API is read-only and only ever renders compact JSON
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
 
-CACHES = {
-    'default': {
+# 'locmem' keeps a separate cache in every worker process, 'sqlite' shares
+# one file between all workers on the host with LRU eviction
+CACHE_BACKEND = 'locmem'
+CACHE_BACKENDS = {
+    'locmem': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    },
+    'sqlite': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache.sqlite3'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
 }
 
 
@@ -103,9 +209,38 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Read replicas: every alias listed here gets a copy of the default database
+# next to it, kept in sync by the sync_replicas command. Reads go to
+# replicas; a client that wrote reads from the primary for
+# REPLICA_PIN_SECONDS so it sees its own changes
+DATABASE_REPLICAS = []
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_COOKIE = 'primary'
+REPLICA_PRIMARY_ONLY = ('sessions', 'core.job')
+for alias in DATABASE_REPLICAS:
+    DATABASES.setdefault(alias, {
+        **DATABASES['default'],
+        'NAME': os.path.join(BASE_DIR, f'db.{alias}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    })
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Applied by core.db to every new SQLite connection. WAL lets readers run
+# alongside a writer, busy_timeout makes writers wait for the lock instead
+# of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
@@ -19,9 +19,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from core import views as core_views
+
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
+    path('admin/performance/', core_views.performance_stats,
+         name='performance'),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
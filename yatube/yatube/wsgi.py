@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Первый запрос к воркеру не должен ждать разбора шаблонов.
+from core.template_cache import is_cached, warm  # noqa: E402
+
+if is_cached():
+    warm()